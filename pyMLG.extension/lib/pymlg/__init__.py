@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Gemeinsame Module für die pyMLG-Tools
+
+pyRevit hängt den lib-Ordner der Extension automatisch an sys.path,
+die Skripte importieren daher direkt z.B. `from pymlg import excel_export`.
+"""
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Batch-Ausführung für Massenänderungen (Sheets/Views erstellen, ...)
+
+Aufbau: ein TransactionGroup für den ganzen Lauf, eine Transaction pro
+Chunk von `chunk_size` Elementen und eine SubTransaction pro Element.
+- ein fehlerhaftes Element rollt nur seine SubTransaction zurück
+- fertige Chunks sind committet, ein später Fehler verliert nicht alles
+- am Ende wird die Gruppe assimiliert -> ein einziger Undo-Eintrag
+"""
+
+import time
+
+DEFAULT_CHUNK_SIZE = 50
+
+
+class BatchResult(object):
+    """Ergebnis eines Batch-Laufs"""
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.chunks = 0
+        self.elapsed = 0.0
+
+    @property
+    def items_per_second(self):
+        total = len(self.succeeded) + len(self.failed)
+        return total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return "{} ok, {} Fehler in {:.2f} s ({:.1f} Elemente/s, {} Chunks)".format(
+            len(self.succeeded), len(self.failed), self.elapsed, self.items_per_second, self.chunks)
+
+
+class BatchExecutor(object):
+    """
+    Führt action(item) für viele Elemente aus
+    Verwendung:
+        result = BatchExecutor(doc, "Sheets kopieren").run(sheets, duplicate_sheet)
+    """
+
+    def __init__(self, doc, name, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.doc = doc
+        self.name = name
+        self.chunk_size = max(int(chunk_size), 1)
+
+    def run(self, items, action):
+        """
+        Returns: BatchResult (succeeded = Rückgabewerte von action,
+                 failed = Liste (item, exception))
+        """
+        from Autodesk.Revit.DB import TransactionGroup
+
+        items = list(items)
+        result = BatchResult()
+        start = time.time()
+
+        group = TransactionGroup(self.doc, self.name)
+        group.Start()
+        try:
+            for offset in range(0, len(items), self.chunk_size):
+                self._run_chunk(items[offset:offset + self.chunk_size], offset, action, result)
+        except Exception:
+            # Bereits committete Chunks behalten
+            self._finish_group(group, result)
+            result.elapsed = time.time() - start
+            raise
+
+        self._finish_group(group, result)
+        result.elapsed = time.time() - start
+        return result
+
+    def _run_chunk(self, chunk, offset, action, result):
+        from Autodesk.Revit.DB import SubTransaction, Transaction, TransactionStatus
+
+        t = Transaction(self.doc, "{} ({}-{})".format(self.name, offset + 1, offset + len(chunk)))
+        t.Start()
+
+        chunk_ok = []
+        try:
+            for item in chunk:
+                sub = SubTransaction(self.doc)
+                sub.Start()
+                try:
+                    value = action(item)
+                    sub.Commit()
+                    chunk_ok.append((item, value))
+                except Exception as e:
+                    if sub.HasStarted() and not sub.HasEnded():
+                        sub.RollBack()
+                    result.failed.append((item, e))
+        except Exception:
+            t.RollBack()
+            raise
+
+        if t.Commit() == TransactionStatus.Committed:
+            result.succeeded.extend(value for _, value in chunk_ok)
+        else:
+            result.failed.extend((item, Exception("Chunk-Commit fehlgeschlagen")) for item, _ in chunk_ok)
+        result.chunks += 1
+
+    @staticmethod
+    def _finish_group(group, result):
+        if result.succeeded:
+            group.Assimilate()
+        else:
+            group.RollBack()
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks für die pyMLG-Engines ohne Revit/Excel
+
+Aufruf aus dem lib-Ordner:  python -m pymlg.benchmarks [name ...]
+"""
+
+import random
+import sys
+import time
+
+from pymlg import excel_export, phase_copy, sheet_layout, tag_layout, tag_solver
+
+# Angenommene Dauer einer COM-Anfrage an Excel (nur für die Hochrechnung)
+ASSUMED_COM_CALL_MS = 0.2
+
+
+# ======================== FAKE EXCEL ========================
+
+class FakeRange(object):
+    """Range-Objekt, das Value2-Zuweisungen zählt"""
+
+    def __init__(self, worksheet, address):
+        self._worksheet = worksheet
+        self.address = address
+
+    @property
+    def Value2(self):
+        return None
+
+    @Value2.setter
+    def Value2(self, value):
+        self._worksheet.calls += 1
+        self._worksheet.range_writes += 1
+
+
+class _CellAccessor(object):
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __setitem__(self, key, value):
+        self._worksheet.calls += 1
+        self._worksheet.cell_writes += 1
+
+
+class _RangeAccessor(object):
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __getitem__(self, address):
+        self._worksheet.calls += 1
+        return FakeRange(self._worksheet, address)
+
+
+class FakeWorksheet(object):
+    """Worksheet-Ersatz, der jede (sonst COM-)Anfrage zählt"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cell_writes = 0
+        self.range_writes = 0
+        self.Cells = _CellAccessor(self)
+        self.Range = _RangeAccessor(self)
+
+
+def _fake_schedule_rows(n_rows, n_cols):
+    return [["R{}C{}".format(row, col) for col in range(n_cols)] for row in range(n_rows)]
+
+
+# ======================== FAKE REVIT ========================
+
+class FakeElementId(object):
+    def __init__(self, value):
+        self.IntegerValue = value
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElementId) and other.IntegerValue == self.IntegerValue
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self.IntegerValue
+
+
+class FakeParameter(object):
+    StorageType = "ElementId"
+
+    def __init__(self, value):
+        self.value = value
+        self.IsReadOnly = False
+
+    def AsElementId(self):
+        return self.value
+
+    def Set(self, value):
+        self.value = value
+
+
+class FakeElement(object):
+    def __init__(self, elem_id, params, host=None):
+        self.Id = elem_id
+        self._params = params
+        self.Host = host
+
+    def get_Parameter(self, bip):
+        return self._params.get(bip)
+
+
+class FakeBuiltInParameter(object):
+    LEVEL_PARAM = "LEVEL_PARAM"
+    WALL_BASE_CONSTRAINT = "WALL_BASE_CONSTRAINT"
+    FAMILY_LEVEL_PARAM = "FAMILY_LEVEL_PARAM"
+    WALL_BASE_OFFSET = "WALL_BASE_OFFSET"
+    PHASE_CREATED = "PHASE_CREATED"
+    PHASE_DEMOLISHED = "PHASE_DEMOLISHED"
+
+
+class FakeDocument(object):
+    """Dokument-Ersatz: Elemente per Id, GetElement zählt Aufrufe"""
+
+    def __init__(self):
+        self.elements = {}
+        self.calls = 0
+
+    def GetElement(self, elem_id):
+        self.calls += 1
+        return self.elements.get(elem_id.IntegerValue)
+
+    def add(self, created, demolished, level_bip=None, level_id=None, host_id=None):
+        elem_id = FakeElementId(len(self.elements) + 1)
+        params = {
+            FakeBuiltInParameter.PHASE_CREATED: FakeParameter(created),
+            FakeBuiltInParameter.PHASE_DEMOLISHED: FakeParameter(demolished),
+        }
+        if level_bip:
+            params[level_bip] = FakeParameter(level_id)
+        host = self.elements[host_id.IntegerValue] if host_id else None
+        self.elements[elem_id.IntegerValue] = FakeElement(elem_id, params, host)
+        return elem_id
+
+
+def _fake_copy_setup(n, levels=3):
+    """
+    n Quellen mit Phasen und n Kopien mit Standard-Phase
+    Quellen reihum: Wand (Base Constraint), Decke (LEVEL_PARAM), Tür in der
+    vorigen Wand (eigenes Familien-Level = nächstes Level) und Element ohne Level
+    """
+    bip = FakeBuiltInParameter
+    doc = FakeDocument()
+    phases = [FakeElementId(-(i + 1)) for i in range(4)]
+    level_ids = [FakeElementId(100000 + i) for i in range(levels)]
+    sources = []
+    wall_id = None
+    for i in range(n):
+        created, level_id = phases[i % 3], level_ids[(i // 4) % levels]
+        kind = i % 4
+        if kind == 0:
+            wall_id = doc.add(created, phases[3], bip.WALL_BASE_CONSTRAINT, level_id)
+            sources.append(wall_id)
+        elif kind == 1:
+            sources.append(doc.add(created, phases[3], bip.LEVEL_PARAM, level_id))
+        elif kind == 2:
+            other_level = level_ids[((i // 4) + 1) % levels]
+            sources.append(doc.add(created, phases[3], bip.FAMILY_LEVEL_PARAM, other_level, wall_id))
+        else:
+            sources.append(doc.add(created, phases[3]))
+    copies = [doc.add(phases[0], None) for _ in range(n)]
+    return doc, sources, copies
+
+
+def _check_level_groups(doc, groups, levels):
+    """Türen müssen in der Gruppe ihrer Wand liegen"""
+    group_of = {}
+    for index, (_, ids) in enumerate(groups):
+        for elem_id in ids:
+            group_of[elem_id.IntegerValue] = index
+    misplaced = 0
+    for id_value, index in group_of.items():
+        host = doc.elements[id_value].Host
+        if host is not None and group_of.get(host.Id.IntegerValue) != index:
+            misplaced += 1
+    if len(groups) != levels + 1 or misplaced:
+        raise AssertionError("Gruppierung: {} Gruppen, {} Türen ohne ihre Wand".format(len(groups), misplaced))
+
+
+def _legacy_phase_copy(doc, selected_ids, copied_ids):
+    """Frühere Schleife aus CopyWithPhases (list(selected_ids)[i] pro Kopie)"""
+    bip = FakeBuiltInParameter
+    original_phases = {}
+    for elem_id in selected_ids:
+        elem = doc.GetElement(elem_id)
+        original_phases[elem_id.IntegerValue] = {
+            'created': elem.get_Parameter(bip.PHASE_CREATED).AsElementId(),
+            'demolished': elem.get_Parameter(bip.PHASE_DEMOLISHED).AsElementId(),
+        }
+    for i, copied_id in enumerate(copied_ids):
+        original_id = list(selected_ids)[i]
+        copied_elem = doc.GetElement(copied_id)
+        phase_info = original_phases[original_id.IntegerValue]
+        copied_elem.get_Parameter(bip.PHASE_CREATED).Set(phase_info['created'])
+        copied_elem.get_Parameter(bip.PHASE_DEMOLISHED).Set(phase_info['demolished'])
+
+
+class FakeXYZ(object):
+    """XYZ-Ersatz mit Operatoren (ein Objekt pro Rechenschritt wie in der API)"""
+
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x, y, z):
+        self.X, self.Y, self.Z = x, y, z
+
+    def __add__(self, other):
+        return FakeXYZ(self.X + other.X, self.Y + other.Y, self.Z + other.Z)
+
+    def __sub__(self, other):
+        return FakeXYZ(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+
+    def __mul__(self, factor):
+        return FakeXYZ(self.X * factor, self.Y * factor, self.Z * factor)
+
+    def DotProduct(self, other):
+        return self.X * other.X + self.Y * other.Y + self.Z * other.Z
+
+    def Normalize(self):
+        length = self.DotProduct(self) ** 0.5
+        return self * (1.0 / length) if length > 0 else FakeXYZ(0.0, 0.0, 0.0)
+
+
+class FakeLine(object):
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def Project(self, point):
+        seg = self.end - self.start
+        seg_len2 = seg.DotProduct(seg)
+        t = (point - self.start).DotProduct(seg) / seg_len2 if seg_len2 > 0 else 0.0
+        return _FakeProjection(self.start + seg * min(max(t, 0.0), 1.0))
+
+
+class _FakeProjection(object):
+    def __init__(self, point):
+        self.XYZPoint = point
+
+
+def _fake_wall_tags(n, seed=1):
+    """n gerade Wände mit je einem Tag in der Nähe"""
+    rnd = random.Random(seed)
+    heads, starts, ends = [], [], []
+    for _ in range(n):
+        x, y = rnd.uniform(0, 1000), rnd.uniform(0, 1000)
+        length = rnd.uniform(3, 30)
+        if rnd.random() < 0.5:
+            start, end = (x, y, 0.0), (x + length, y, 0.0)
+        else:
+            start, end = (x, y, 0.0), (x, y + length, 0.0)
+        heads.append((x + rnd.uniform(-2, length + 2), y + rnd.uniform(-3, 3), 0.0))
+        starts.append(start)
+        ends.append(end)
+    return heads, starts, ends
+
+
+def _fake_dense_tags(n, seed=2):
+    """Dichter Grundriss: Wände im Raster, mehrere Tags pro Wand an ähnlicher Stelle"""
+    rnd = random.Random(seed)
+    walls_per_row = max(int((n / 3.0) ** 0.5), 1)
+    specs = []
+    for i in range(n):
+        wall = i // 3
+        x, y = (wall % walls_per_row) * 12.0, (wall // walls_per_row) * 6.0
+        start, end = (x, y, 0.0), (x + 10.0, y, 0.0)
+        head = (x + 5.0 + rnd.uniform(-0.3, 0.3), y + 1.6, 0.0)
+        specs.append(tag_layout.TagSpec(head, start, end, 1.0, 0.4))
+    return specs
+
+
+# ======================== BENCHMARKS ========================
+
+def bench_excel(n_rows=20000, n_cols=12):
+    """Zellweises Schreiben vs. Block-Schreiben"""
+    rows = _fake_schedule_rows(n_rows, n_cols)
+
+    per_cell = FakeWorksheet()
+    start = time.time()
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            per_cell.Cells[r + 1, c + 1] = value
+    per_cell_time = time.time() - start
+
+    bulk = FakeWorksheet()
+    start = time.time()
+    excel_export.write_block(bulk, rows)
+    bulk_time = time.time() - start
+
+    print("Excel-Export {} x {} Zellen".format(n_rows, n_cols))
+    for label, sheet, elapsed in (("pro Zelle", per_cell, per_cell_time),
+                                  ("Block", bulk, bulk_time)):
+        print("  {:<10} {:>8} COM-Aufrufe  {:>7.3f} s lokal  ~{:>8.1f} s bei {} ms/Aufruf".format(
+            label, sheet.calls, elapsed, sheet.calls * ASSUMED_COM_CALL_MS / 1000.0, ASSUMED_COM_CALL_MS))
+    print("  Faktor: {:.0f}x weniger Aufrufe".format(float(per_cell.calls) / max(bulk.calls, 1)))
+
+
+def bench_phase_copy(sizes=(1000, 10000, 50000), legacy_limit=10000):
+    """Phasen-Übernahme: Engine (linear) vs. frühere Schleife (quadratisch)"""
+    phase_copy.BuiltInParameter = phase_copy.BuiltInParameter or FakeBuiltInParameter
+
+    print("Copy with Phases (Stub-Dokument)")
+    for n in sizes:
+        doc, sources, copies = _fake_copy_setup(n)
+        start = time.time()
+        snapshot = phase_copy.snapshot(doc, sources)
+        groups = phase_copy.group_by_level(snapshot, sources, phase_copy.host_map(doc, sources))
+        written = phase_copy.apply_phases(doc, phase_copy.pair_copies(sources, copies), snapshot)
+        engine_time = time.time() - start
+        _check_level_groups(doc, groups, 3)
+
+        legacy = "(übersprungen)"
+        if n <= legacy_limit:
+            doc, sources, copies = _fake_copy_setup(n)
+            start = time.time()
+            _legacy_phase_copy(doc, sources, copies)
+            legacy = "{:.3f} s".format(time.time() - start)
+
+        print("  {:>6} Elemente  Engine {:.3f} s ({} Parameter, {} Level-Gruppen)  bisher {}".format(
+            n, engine_time, written, len(groups), legacy))
+
+
+def bench_tag_solver(n=50000, offset=500 / 304.8):
+    """Tag-Abstände: pro Tag mit XYZ-Objekten vs. Batch-Löser"""
+    heads, starts, ends = _fake_wall_tags(n)
+
+    start = time.time()
+    for head, a, b in zip(heads, starts, ends):
+        tag_head = FakeXYZ(*head)
+        closest = FakeLine(FakeXYZ(*a), FakeXYZ(*b)).Project(tag_head).XYZPoint
+        direction = (closest - tag_head).Normalize()
+        closest - direction * offset
+        closest - direction * (offset * tag_solver.ELBOW_RATIO)
+    per_tag_time = time.time() - start
+
+    results = [("pro Tag (XYZ)", per_tag_time)]
+    start = time.time()
+    reference = tag_solver.solve_offsets(heads, starts, ends, offset, use_numpy=False)
+    results.append(("Batch (Python)", time.time() - start))
+
+    deviation = None
+    if tag_solver.np is not None:
+        start = time.time()
+        vectorized = tag_solver.solve_offsets(heads, starts, ends, offset, use_numpy=True)
+        results.append(("Batch (NumPy)", time.time() - start))
+        deviation = max(abs(p - q) for a, b in zip(reference[0], vectorized[0]) for p, q in zip(a, b))
+
+    print("Wall-Tag-Löser {} Tags".format(n))
+    for label, elapsed in results:
+        print("  {:<16} {:>7.3f} s  ({:.0f} Tags/s)".format(label, elapsed, n / elapsed if elapsed else 0))
+    if deviation is not None:
+        print("  max. Abweichung Python/NumPy: {:.2e}".format(deviation))
+
+
+def bench_tag_layout(sizes=(1000, 5000, 20000)):
+    """Tag-Anordnung: Laufzeit und Überlappungen vorher/nachher"""
+    print("Tag-Anordnung (Spatial Hash)")
+    for n in sizes:
+        specs = _fake_dense_tags(n)
+        before = tag_layout.count_overlaps([spec.head for spec in specs], specs)
+        start = time.time()
+        result = tag_layout.layout_tags(specs)
+        elapsed = time.time() - start
+        after = tag_layout.count_overlaps(result.heads, specs)
+        print("  {:>6} Tags  {:.3f} s ({:.0f} Tags/s)  Überlappungen {} -> {}  [{}]".format(
+            n, elapsed, n / elapsed if elapsed else 0, before, after, result.summary()))
+
+
+def bench_sheet_layout(n=2000, area=(50.0, 30.0), gap=1.0):
+    """Ansichten auf Sheets verteilen: Anzahl Sheets, Füllgrad, Laufzeit"""
+    rnd = random.Random(3)
+    items = [(i, rnd.uniform(4, 24), rnd.uniform(3, 14)) for i in range(n)]
+
+    start = time.time()
+    sheets = sheet_layout.pack_shelves(items, area[0], area[1], gap)
+    elapsed = time.time() - start
+
+    # Kontrolle: keine Überlappung, alles im Bereich
+    overlaps = 0
+    for placements in sheets:
+        boxes = [(p.x - p.width / 2, p.y - p.height / 2, p.x + p.width / 2, p.y + p.height / 2)
+                 for p in placements]
+        for i, a in enumerate(boxes):
+            for b in boxes[i + 1:]:
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    overlaps += 1
+
+    print("Sheet-Layout {} Ansichten auf {} x {} cm".format(n, area[0], area[1]))
+    print("  {} Sheets ({:.1f} Ansichten/Sheet), Füllgrad {:.0%}, {:.3f} s, Überlappungen {}".format(
+        len(sheets), float(n) / len(sheets), sheet_layout.fill_ratio(sheets, area[0], area[1]),
+        elapsed, overlaps))
+
+
+BENCHMARKS = {
+    "excel": bench_excel,
+    "phase_copy": bench_phase_copy,
+    "sheet_layout": bench_sheet_layout,
+    "tag_layout": bench_tag_layout,
+    "tag_solver": bench_tag_solver,
+}
+
+
+def main(names):
+    for name in names or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+        print("")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
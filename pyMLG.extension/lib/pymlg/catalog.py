@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""Katalog-Cache pro Dokument: Ansichtsvorlagen, Filter, Plankopf-Typen, ViewFamilyTypes
+
+Die Listen werden einmal gesammelt und über Button-Klicks hinweg in den
+AppDomain-Daten gehalten (jeder pyRevit-Klick hat eine neue Script-Umgebung).
+Gespeichert werden nur (Name, Id)-Paare, keine Elemente und keine Klassen:
+so bleibt der Cache auch nach einem pyRevit-Reload lesbar.
+
+Ein DocumentChanged-Handler (einmal pro Revit-Sitzung registriert) verwirft
+den betroffenen Abschnitt, sobald ein passendes Element hinzukommt, geändert
+(z.B. umbenannt) oder gelöscht wird. Beim Schließen eines Dokuments
+(DocumentClosing) wird sein Eintrag ganz verworfen: nach Schließen ohne
+Speichern oder erneutem Laden aus dem Zentralmodell gelten Namen und Ids
+nicht mehr.
+"""
+
+APPDOMAIN_KEY = "pymlg.catalog"
+HANDLER_KEY = "pymlg.catalog.handler"
+CLOSING_HANDLER_KEY = "pymlg.catalog.closing_handler"
+
+TEMPLATES = "templates"
+FILTERS = "filters"
+TITLEBLOCK_TYPES = "titleblock_types"
+VIEW_FAMILY_TYPES = "view_family_types"
+SECTIONS = (TEMPLATES, FILTERS, TITLEBLOCK_TYPES, VIEW_FAMILY_TYPES)
+
+# Ab so vielen geänderten Elementen wird nicht einzeln geprüft, sondern alles verworfen
+MAX_CHECKED_CHANGES = 1000
+
+
+# ======================== SPEICHER ========================
+
+def _store():
+    """dict {doc_key: {abschnitt: [(name, id_int)]}} aus den AppDomain-Daten"""
+    from System import AppDomain
+
+    domain = AppDomain.CurrentDomain
+    store = domain.GetData(APPDOMAIN_KEY)
+    if store is None:
+        store = {}
+        domain.SetData(APPDOMAIN_KEY, store)
+    return store
+
+
+def _doc_key(doc):
+    return u"{}|{}".format(doc.PathName or u"", doc.Title)
+
+
+# ======================== SAMMELN ========================
+
+def _collect_templates(doc):
+    from Autodesk.Revit.DB import FilteredElementCollector, View
+
+    return [(v.Name, v.Id.IntegerValue) for v in FilteredElementCollector(doc).OfClass(View) if v.IsTemplate]
+
+
+def _collect_filters(doc):
+    from Autodesk.Revit.DB import FilterElement, FilteredElementCollector
+
+    return [(f.Name, f.Id.IntegerValue) for f in FilteredElementCollector(doc).OfClass(FilterElement)]
+
+
+def _collect_titleblock_types(doc):
+    from Autodesk.Revit.DB import BuiltInCategory, BuiltInParameter, FilteredElementCollector
+
+    name_bip = BuiltInParameter.SYMBOL_FAMILY_AND_TYPE_NAMES_PARAM
+    entries = []
+    collector = FilteredElementCollector(doc) \
+        .OfCategory(BuiltInCategory.OST_TitleBlocks) \
+        .WhereElementIsElementType()
+    for tb in collector:
+        param = tb.get_Parameter(name_bip)
+        entries.append(((param.AsString() or u"") if param else u"", tb.Id.IntegerValue))
+    return entries
+
+
+def _collect_view_family_types(doc):
+    from Autodesk.Revit.DB import BuiltInParameter, FilteredElementCollector, ViewFamilyType
+
+    # Name: "<ViewFamily>: <Typname>", z.B. "Section: Schnitt"
+    name_bip = BuiltInParameter.SYMBOL_NAME_PARAM
+    entries = []
+    for vft in FilteredElementCollector(doc).OfClass(ViewFamilyType):
+        param = vft.get_Parameter(name_bip)
+        entries.append((u"{}: {}".format(vft.ViewFamily, (param.AsString() or u"") if param else u""),
+                        vft.Id.IntegerValue))
+    return entries
+
+
+_COLLECTORS = {
+    TEMPLATES: _collect_templates,
+    FILTERS: _collect_filters,
+    TITLEBLOCK_TYPES: _collect_titleblock_types,
+    VIEW_FAMILY_TYPES: _collect_view_family_types,
+}
+
+
+def entries(doc, section):
+    """
+    (Name, Id)-Paare eines Abschnitts, beim ersten Zugriff gesammelt
+    Returns: list [(name, id_int)]
+    """
+    _ensure_handler(doc)
+    doc_data = _store().setdefault(_doc_key(doc), {})
+    cached = doc_data.get(section)
+    if cached is None:
+        cached = doc_data[section] = _COLLECTORS[section](doc)
+    return cached
+
+
+def elements(doc, section):
+    """Elemente eines Abschnitts (gelöschte werden übersprungen)"""
+    from Autodesk.Revit.DB import ElementId
+
+    result = []
+    for name, id_value in entries(doc, section):
+        elem = doc.GetElement(ElementId(id_value))
+        if elem is not None:
+            result.append(elem)
+    return result
+
+
+def find(doc, section, name):
+    """Erstes Element mit diesem Namen oder None"""
+    from Autodesk.Revit.DB import ElementId
+
+    for entry_name, id_value in entries(doc, section):
+        if entry_name == name:
+            return doc.GetElement(ElementId(id_value))
+    return None
+
+
+def templates(doc):
+    return elements(doc, TEMPLATES)
+
+
+def filters(doc):
+    return elements(doc, FILTERS)
+
+
+def titleblock_types(doc):
+    return elements(doc, TITLEBLOCK_TYPES)
+
+
+def view_family_types(doc):
+    return elements(doc, VIEW_FAMILY_TYPES)
+
+
+def invalidate(doc=None, section=None):
+    """Verwirft den Cache (alle Dokumente, ein Dokument oder einen Abschnitt)"""
+    store = _store()
+    if doc is None:
+        store.clear()
+        return
+    doc_data = store.get(_doc_key(doc))
+    if doc_data is None:
+        return
+    if section is None:
+        doc_data.clear()
+    else:
+        doc_data.pop(section, None)
+
+
+# ======================== INVALIDIERUNG ========================
+
+def _sections_for(elem):
+    """Abschnitte, die ein hinzugefügtes/geändertes Element betrifft"""
+    from Autodesk.Revit.DB import BuiltInCategory, ElementType, FilterElement, View, ViewFamilyType
+
+    if isinstance(elem, View):
+        return (TEMPLATES,) if elem.IsTemplate else ()
+    if isinstance(elem, FilterElement):
+        return (FILTERS,)
+    if isinstance(elem, ViewFamilyType):
+        return (VIEW_FAMILY_TYPES,)
+    if isinstance(elem, ElementType) and elem.Category is not None \
+            and elem.Category.Id.IntegerValue == int(BuiltInCategory.OST_TitleBlocks):
+        return (TITLEBLOCK_TYPES,)
+    return ()
+
+
+def _on_document_changed(sender, args):
+    """DocumentChanged: betroffene Abschnitte des Dokuments verwerfen"""
+    try:
+        doc = args.GetDocument()
+        doc_data = _store().get(_doc_key(doc))
+        if not doc_data:
+            return
+
+        changed_ids = list(args.GetAddedElementIds()) + list(args.GetModifiedElementIds())
+        if len(changed_ids) > MAX_CHECKED_CHANGES:
+            doc_data.clear()
+            return
+
+        stale = set()
+        for elem_id in changed_ids:
+            elem = doc.GetElement(elem_id)
+            if elem is not None:
+                stale.update(_sections_for(elem))
+
+        deleted = set(elem_id.IntegerValue for elem_id in args.GetDeletedElementIds())
+        if deleted:
+            for section, cached in doc_data.items():
+                if any(id_value in deleted for _, id_value in cached):
+                    stale.add(section)
+
+        for section in stale:
+            doc_data.pop(section, None)
+    except Exception:
+        # Ein Fehler im Handler darf Revit nicht stören -> lieber alles verwerfen
+        try:
+            _store().clear()
+        except Exception:
+            pass
+
+
+def _on_document_closing(sender, args):
+    """DocumentClosing: Eintrag des Dokuments verwerfen"""
+    try:
+        _store().pop(_doc_key(args.Document), None)
+    except Exception:
+        try:
+            _store().clear()
+        except Exception:
+            pass
+
+
+def _ensure_handler(doc):
+    """Registriert die DocumentChanged/DocumentClosing-Handler einmal pro Revit-Sitzung"""
+    from System import AppDomain
+
+    domain = AppDomain.CurrentDomain
+    if not domain.GetData(HANDLER_KEY):
+        doc.Application.DocumentChanged += _on_document_changed
+        domain.SetData(HANDLER_KEY, True)
+    if not domain.GetData(CLOSING_HANDLER_KEY):
+        doc.Application.DocumentClosing += _on_document_closing
+        domain.SetData(CLOSING_HANDLER_KEY, True)
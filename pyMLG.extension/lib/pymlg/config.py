@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""JSON-Einstellungen der pyMLG-Tools unter %APPDATA%/pyRevit
+
+Wie ribbon_settings.json im TabManager: eine Datei pro Tool, fehlende
+Schlüssel werden mit den Standardwerten ergänzt. Beim ersten Aufruf wird die
+Datei mit den Standardwerten angelegt, damit sie von Hand angepasst werden kann.
+"""
+
+import json
+import os
+
+CONFIG_DIR = os.path.join(os.getenv('APPDATA') or os.path.expanduser('~'), 'pyRevit')
+
+
+def config_path(name):
+    """Pfad der Einstellungsdatei, z.B. config_path('tag_distance') -> ...\\pyMLG_tag_distance.json"""
+    return os.path.join(CONFIG_DIR, 'pyMLG_{}.json'.format(name))
+
+
+def save_config(name, settings):
+    path = config_path(name)
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(path, 'w') as f:
+        json.dump(settings, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_config(name, defaults=None, create=True):
+    """
+    Liest die Einstellungen eines Tools
+    defaults: dict mit Standardwerten (fehlende Schlüssel werden ergänzt)
+    create: Datei mit den Standardwerten anlegen, wenn sie fehlt
+    Returns: dict
+    """
+    settings = dict(defaults or {})
+    path = config_path(name)
+
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            settings.update(json.load(f))
+    elif create and defaults:
+        try:
+            save_config(name, settings)
+        except (IOError, OSError):
+            pass
+
+    return settings
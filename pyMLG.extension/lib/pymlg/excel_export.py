@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Export-Engine für Schedules nach Excel
+
+Zwei Backends mit derselben Schnittstelle (add_sheet / write_row / close):
+- "xlsx":    reiner Python-Writer, braucht kein Office (Standard)
+- "interop": Excel über COM, schreibt blockweise per Range-Zuweisung (Fallback)
+"""
+
+import re
+
+from pymlg.xlsx_writer import XlsxWriter, column_letter, unique_sheet_name
+
+BACKEND_XLSX = "xlsx"
+BACKEND_INTEROP = "interop"
+
+# Max. Zeilen pro Range-Zuweisung (große Arrays machen COM-Marshalling langsam)
+DEFAULT_CHUNK_ROWS = 5000
+
+# Nur eindeutige Zahlen konvertieren: keine führenden Nullen ("007"), max. 15 Stellen
+_INT_TEXT = re.compile(r"^-?(0|[1-9][0-9]{0,14})$")
+_FLOAT_TEXT = re.compile(r"^-?(0|[1-9][0-9]{0,14})\.[0-9]+$")
+
+try:
+    _TEXT_TYPES = (basestring,)
+except NameError:
+    _TEXT_TYPES = (str,)
+
+
+def cell_address(row, col):
+    """1-basierte Zeile/Spalte als Excel-Adresse (z.B. 'C12')"""
+    return "{}{}".format(column_letter(col), row)
+
+
+def convert_cell(value):
+    """Wandelt reinen Zahlentext in int/float um, alles andere bleibt unverändert"""
+    if not value or not isinstance(value, _TEXT_TYPES):
+        return value
+    if _INT_TEXT.match(value):
+        return int(value)
+    if _FLOAT_TEXT.match(value):
+        return float(value)
+    return value
+
+
+def convert_row(values):
+    return [convert_cell(value) for value in values]
+
+
+def iter_section_rows(section_data):
+    """Liefert die Zeilen einer TableSectionData nacheinander als Liste von Zellentexten"""
+    if not section_data:
+        return
+
+    n_rows = section_data.NumberOfRows
+    n_cols = section_data.NumberOfColumns
+
+    for row in range(n_rows):
+        yield [section_data.GetCellText(row, col) for col in range(n_cols)]
+
+
+def read_section(section_data):
+    """
+    Liest eine TableSectionData komplett aus
+    Returns: list [zeile][spalte] mit dem Zellentext
+    """
+    return list(iter_section_rows(section_data))
+
+
+def get_schedule_sections(schedule):
+    """
+    Holt Header- und Body-Abschnitt einer ViewSchedule
+    Returns: (header_data, body_data)
+    """
+    from Autodesk.Revit.DB import SectionType
+
+    table_data = schedule.GetTableData()
+    return table_data.GetSectionData(SectionType.Header), table_data.GetSectionData(SectionType.Body)
+
+
+def read_schedule_block(schedule):
+    """
+    Liest Header- und Body-Abschnitt einer ViewSchedule
+    Returns: (header_rows, body_rows)
+    """
+    header_data, body_data = get_schedule_sections(schedule)
+    return read_section(header_data), read_section(body_data)
+
+
+def _to_2d_array(rows, width):
+    """Baut ein object[,] für Range.Value2 (ausserhalb von .NET: verschachtelte Listen)"""
+    try:
+        import System
+    except ImportError:
+        return [list(row) + [""] * (width - len(row)) for row in rows]
+
+    array = System.Array.CreateInstance(System.Object, len(rows), width)
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            array[r, c] = value
+    return array
+
+
+def write_block(worksheet, rows, start_row=1, start_col=1, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Schreibt einen 2D-Block ab (start_row, start_col) in das Worksheet
+    Eine Range-Zuweisung pro Chunk von `chunk_rows` Zeilen.
+    Returns: Anzahl der Range-Zuweisungen
+    """
+    writes = 0
+
+    for offset in range(0, len(rows), chunk_rows):
+        chunk = rows[offset:offset + chunk_rows]
+        width = max(len(row) for row in chunk)
+        if width == 0:
+            continue
+
+        first = cell_address(start_row + offset, start_col)
+        last = cell_address(start_row + offset + len(chunk) - 1, start_col + width - 1)
+        worksheet.Range["{}:{}".format(first, last)].Value2 = _to_2d_array(chunk, width)
+        writes += 1
+
+    return writes
+
+
+# ======================== INTEROP-BACKEND ========================
+
+class InteropSheet(object):
+    """Puffert Zeilen und schreibt sie chunkweise per write_block"""
+
+    def __init__(self, worksheet, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.worksheet = worksheet
+        self.name = worksheet.Name
+        self.row_count = 0
+        self._chunk_rows = chunk_rows
+        self._buffer = []
+
+    def write_row(self, values):
+        self._buffer.append(list(values))
+        if len(self._buffer) >= self._chunk_rows:
+            self._flush()
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def close(self):
+        self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        write_block(self.worksheet, self._buffer, start_row=self.row_count + 1, chunk_rows=self._chunk_rows)
+        self.row_count += len(self._buffer)
+        self._buffer = []
+
+
+class InteropWorkbook(object):
+    """Excel-Arbeitsmappe über Microsoft.Office.Interop (benötigt installiertes Excel)"""
+
+    def __init__(self, path):
+        import clr
+        clr.AddReference("Microsoft.Office.Interop.Excel")
+        from Microsoft.Office.Interop import Excel
+
+        self.path = path
+        self._sheets = []
+        self._used_names = set()
+        self._app = Excel.ApplicationClass()
+        self._app.Visible = False
+        self._workbook = self._app.Workbooks.Add()
+
+    def add_sheet(self, name):
+        worksheet = self._workbook.Worksheets.Add()
+        worksheet.Name = unique_sheet_name(name, self._used_names)
+        sheet = InteropSheet(worksheet)
+        self._sheets.append(sheet)
+        return sheet
+
+    def close(self):
+        try:
+            for sheet in self._sheets:
+                sheet.close()
+            self._workbook.SaveAs(self.path)
+            self._workbook.Close()
+        finally:
+            self._app.Quit()
+
+    def discard(self):
+        try:
+            self._workbook.Close(False)
+        finally:
+            self._app.Quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+
+def open_workbook(path, backend=BACKEND_XLSX):
+    """Öffnet eine neue Arbeitsmappe mit dem gewünschten Backend"""
+    if backend == BACKEND_INTEROP:
+        return InteropWorkbook(path)
+    return XlsxWriter(path)
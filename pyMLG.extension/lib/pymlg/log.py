@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Logging/Instrumentierung für die pyMLG-Tools
+
+Standard ist "nur Zusammenfassung": Meldungen werden gezählt, aber nicht
+einzeln ins pyRevit-Ausgabefenster geschrieben. Am Ende gibt
+`log.summary()` Anzahl Warnungen/Fehler (mit den ersten Meldungen),
+Ergebniszeilen aus `log.report()` (immer) und gemessene Zeiten aus. Ausführliche Ausgabe:
+- Strg-Klick auf den Button (pyRevit Debug-Modus) -> DEBUG
+- Umgebungsvariable PYMLG_LOG_LEVEL=DEBUG|INFO|WARNING|ERROR|SUMMARY
+
+In heißen Schleifen vor dem Formatieren prüfen:
+    if log.debug_enabled:
+        log.debug("Zeile %s: %s", row, text)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+SUMMARY = 50
+
+LEVEL_NAMES = {
+    DEBUG: "DEBUG",
+    INFO: "INFO",
+    WARNING: "WARNUNG",
+    ERROR: "FEHLER",
+    SUMMARY: "SUMMARY",
+}
+
+ENV_VAR = "PYMLG_LOG_LEVEL"
+DEFAULT_LEVEL = SUMMARY
+
+# Wie viele Warnungen/Fehler die Zusammenfassung im Wortlaut zeigt
+MAX_SUMMARY_MESSAGES = 5
+
+
+class BufferedSink(object):
+    """Sammelt Zeilen und schreibt sie gebündelt (ein print pro Block)"""
+
+    def __init__(self, write=None, flush_every=200):
+        self._write = write or _print
+        self._flush_every = flush_every
+        self._lines = []
+
+    def emit(self, line):
+        self._lines.append(line)
+        if len(self._lines) >= self._flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            self._write("\n".join(self._lines))
+            self._lines = []
+
+
+class MemorySink(object):
+    """Behält alle Zeilen im Speicher (z.B. für Berichte)"""
+
+    def __init__(self):
+        self.lines = []
+
+    def emit(self, line):
+        self.lines.append(line)
+
+    def flush(self):
+        pass
+
+
+def _print(text):
+    print(text)
+
+
+def _level_from_name(name):
+    name = (name or "").strip().upper()
+    for level, level_name in LEVEL_NAMES.items():
+        if level_name == name:
+            return level
+    return {"WARNING": WARNING, "ERROR": ERROR}.get(name)
+
+
+def default_level():
+    """Level aus Umgebungsvariable bzw. pyRevit Debug-Modus (Strg-Klick)"""
+    level = _level_from_name(os.environ.get(ENV_VAR))
+    if level is not None:
+        return level
+
+    try:
+        from pyrevit import EXEC_PARAMS
+        if EXEC_PARAMS.debug_mode:
+            return DEBUG
+    except Exception:
+        pass
+
+    return DEFAULT_LEVEL
+
+
+class Logger(object):
+    """Logger mit Level-Filter, Zählern und Zeitmessung"""
+
+    def __init__(self, name, level=None, sink=None):
+        self.name = name
+        self.sink = sink or BufferedSink()
+        self.counts = dict((level_value, 0) for level_value in LEVEL_NAMES)
+        self.messages = {WARNING: [], ERROR: []}
+        self.timings = {}
+        self.reports = []
+        self.set_level(default_level() if level is None else level)
+
+    def set_level(self, level):
+        self.level = level
+        self.debug_enabled = level <= DEBUG
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, msg, *args):
+        self.counts[level] = self.counts.get(level, 0) + 1
+
+        keep = level in self.messages and len(self.messages[level]) < MAX_SUMMARY_MESSAGES
+        if level < self.level and not keep:
+            return
+
+        text = msg % args if args else msg
+        if keep:
+            self.messages[level].append(text)
+        if level >= self.level:
+            self.sink.emit(u"[{}] {}".format(LEVEL_NAMES.get(level, level), text))
+
+    def debug(self, msg, *args):
+        if self.debug_enabled:
+            self.log(DEBUG, msg, *args)
+
+    def info(self, msg, *args):
+        self.log(INFO, msg, *args)
+
+    def warning(self, msg, *args):
+        self.log(WARNING, msg, *args)
+
+    def error(self, msg, *args):
+        self.log(ERROR, msg, *args)
+
+    def report(self, msg, *args):
+        """Ergebniszeile für summary(), auf jedem Level ausgegeben (z.B. Durchsatz, Zeitvergleich)"""
+        self.reports.append(msg % args if args else msg)
+
+    @contextmanager
+    def timer(self, label):
+        """Misst die Dauer eines Blocks (summiert pro label)"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings[label] = self.timings.get(label, 0.0) + time.time() - start
+
+    def flush(self):
+        self.sink.flush()
+
+    def summary_lines(self):
+        lines = []
+        warnings = self.counts.get(WARNING, 0)
+        errors = self.counts.get(ERROR, 0)
+
+        if warnings or errors:
+            lines.append(u"{}: {} Warnung(en), {} Fehler".format(self.name, warnings, errors))
+            for level in (ERROR, WARNING):
+                for text in self.messages[level]:
+                    lines.append(u"  {} {}".format(LEVEL_NAMES[level], text))
+                hidden = self.counts.get(level, 0) - len(self.messages[level])
+                if hidden > 0:
+                    lines.append(u"  ... und {} weitere".format(hidden))
+
+        if self.reports:
+            if not lines:
+                lines.append(u"{}:".format(self.name))
+            for text in self.reports:
+                lines.append(u"  {}".format(text))
+
+        if self.timings and self.level < SUMMARY:
+            if not lines:
+                lines.append(u"{}:".format(self.name))
+            for label in sorted(self.timings):
+                lines.append(u"  Zeit {}: {:.2f} s".format(label, self.timings[label]))
+
+        return lines
+
+    def summary(self):
+        """Gibt offene Meldungen und die Zusammenfassung aus (nur wenn es etwas zu sagen gibt)"""
+        self.flush()
+        lines = self.summary_lines()
+        if lines:
+            _print("\n".join(lines))
+
+
+def get_logger(name):
+    """
+    Neuer Logger für einen Skriptlauf (am Anfang des Skripts aufrufen)
+    pyRevit behält pymlg.log zwischen den Klicks geladen: ein gemerkter Logger
+    würde Zähler, Zeiten und Ergebniszeilen früherer Läufe mitnehmen und das
+    Level (Strg-Klick) nicht neu lesen.
+    """
+    return Logger(name)
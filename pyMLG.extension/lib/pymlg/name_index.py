@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Namens-Index für eindeutige View-Namen und Sheet-Nummern
+
+Ein Hash-Set statt Listen-Suche, dazu ein Zähler pro (Basis, Muster): die
+nächste "Kopie N" wird ab dem zuletzt vergebenen N gesucht, nicht wieder
+ab 1. Massen-Duplizieren bleibt damit linear.
+"""
+
+COPY_PATTERN = u"{} - Kopie {}"
+
+
+class NameIndex(object):
+    """Menge vergebener Namen mit Zählern pro Basisnamen"""
+
+    def __init__(self, names=()):
+        self._names = set(names)
+        self._counters = {}
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        self._names.add(name)
+
+    def discard(self, name):
+        self._names.discard(name)
+
+    def allocate(self, base, pattern=COPY_PATTERN, start=1, try_base=False):
+        """
+        Reserviert den nächsten freien Namen pattern.format(base, n) mit n >= start
+        try_base: zuerst den Basisnamen selbst versuchen
+        Returns: (name, n) - n ist None, wenn der Basisname frei war
+        """
+        if try_base and base not in self._names:
+            self._names.add(base)
+            return base, None
+
+        key = (base, pattern)
+        counter = max(self._counters.get(key, start), start)
+        name = pattern.format(base, counter)
+        while name in self._names:
+            counter += 1
+            name = pattern.format(base, counter)
+
+        self._counters[key] = counter + 1
+        self._names.add(name)
+        return name, counter
+
+    def next_free(self, base, pattern=COPY_PATTERN, start=1, try_base=False):
+        """Wie allocate(), liefert nur den Namen"""
+        return self.allocate(base, pattern, start, try_base)[0]
+
+
+def view_name_index(doc):
+    """Index aller View-Namen im Projekt (ein Collector-Durchlauf)"""
+    from Autodesk.Revit.DB import FilteredElementCollector, View
+
+    return NameIndex(v.Name for v in FilteredElementCollector(doc).OfClass(View))
+
+
+def sheet_number_index(doc):
+    """Index aller Sheet-Nummern im Projekt (ein Collector-Durchlauf)"""
+    from Autodesk.Revit.DB import FilteredElementCollector, ViewSheet
+
+    return NameIndex(s.SheetNumber for s in FilteredElementCollector(doc).OfClass(ViewSheet))
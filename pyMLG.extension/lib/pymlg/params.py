@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Zwischenspeicher für Parameterwerte (BuiltInParameter/Definition)
+
+Statt verstreuter `element.get_Parameter(...)`-Aufrufe werden die benötigten
+Parameter einer Element-Liste in einem Durchlauf gelesen und spaltenweise
+gespeichert: {parameter: {element_id (int): wert}}. Weitere Zugriffe auf
+dasselbe (Element, Parameter) kommen aus dem Speicher.
+
+Nach Änderungen im Modell ist der Inhalt veraltet: Schreibzugriffe in
+`cache.transaction(name)` ausführen (leert den Cache am Ende) oder selbst
+`invalidate()` aufrufen.
+"""
+
+from contextlib import contextmanager
+
+# Lese-Methode je StorageType (Name des Enum-Werts)
+_STORAGE_READERS = {
+    "Double": "AsDouble",
+    "Integer": "AsInteger",
+    "String": "AsString",
+    "ElementId": "AsElementId",
+}
+
+
+def parameter_value(param):
+    """Rohwert eines Parameters passend zum StorageType (None ohne Parameter)"""
+    if param is None:
+        return None
+    reader = _STORAGE_READERS.get(str(param.StorageType))
+    return getattr(param, reader)() if reader else None
+
+
+class ParameterCache(object):
+    """
+    Spalten-Cache für Parameterwerte
+    Verwendung:
+        params = ParameterCache(doc, [BuiltInParameter.WALL_BASE_OFFSET])
+        params.load(element_ids)
+        offset = params.get(elem_id, BuiltInParameter.WALL_BASE_OFFSET)
+    reader: wandelt den Parameter in den gespeicherten Wert (Standard: Rohwert)
+    """
+
+    def __init__(self, doc, keys=(), reader=parameter_value):
+        self.doc = doc
+        self.keys = list(keys)
+        self.reader = reader
+        self._columns = dict((key, {}) for key in self.keys)
+        self.reads = 0
+
+    def _column(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = {}
+        return column
+
+    def _read(self, element, key):
+        self.reads += 1
+        try:
+            return self.reader(element.get_Parameter(key))
+        except Exception:
+            return None
+
+    def load(self, element_ids):
+        """Liest alle deklarierten Parameter der Elemente in einem Durchlauf"""
+        return self.load_elements(self.doc.GetElement(elem_id) for elem_id in element_ids)
+
+    def load_elements(self, elements):
+        """Wie load(), für bereits geholte Elemente"""
+        columns = [(key, self._column(key)) for key in self.keys]
+        count = 0
+        for element in elements:
+            if element is None:
+                continue
+            id_value = element.Id.IntegerValue
+            for key, column in columns:
+                if id_value not in column:
+                    column[id_value] = self._read(element, key)
+            count += 1
+        return count
+
+    def get(self, element, key, default=None):
+        """
+        Wert für (Element, Parameter); nicht geladene Werte werden einmal gelesen
+        element: Element oder ElementId
+        """
+        id_value = element.IntegerValue if hasattr(element, "IntegerValue") else element.Id.IntegerValue
+        column = self._column(key)
+        if id_value in column:
+            value = column[id_value]
+        else:
+            if hasattr(element, "IntegerValue"):
+                element = self.doc.GetElement(element)
+            value = column[id_value] = self._read(element, key) if element is not None else None
+        return default if value is None else value
+
+    def column(self, key):
+        """Bereits gelesene Werte eines Parameters: dict {element_id (int): wert}"""
+        return dict(self._column(key))
+
+    def invalidate(self, element_ids=None):
+        """Verwirft alle (oder die Werte der angegebenen Elemente)"""
+        if element_ids is None:
+            for column in self._columns.values():
+                column.clear()
+            return
+        id_values = [elem_id.IntegerValue for elem_id in element_ids]
+        for column in self._columns.values():
+            for id_value in id_values:
+                column.pop(id_value, None)
+
+    @contextmanager
+    def transaction(self, name):
+        """Transaction, nach der der Cache geleert wird (Commit oder Rollback)"""
+        from Autodesk.Revit.DB import Transaction
+
+        t = Transaction(self.doc, name)
+        t.Start()
+        try:
+            yield t
+            t.Commit()
+        except Exception:
+            if t.HasStarted() and not t.HasEnded():
+                t.RollBack()
+            raise
+        finally:
+            self.invalidate()
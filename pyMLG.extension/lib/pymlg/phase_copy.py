@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Kopieren mit Phasen-Übernahme
+
+Linear in der Anzahl Elemente:
+- Phasen, Level und Base Offset aller Quell-Elemente werden in einem
+  Durchlauf gelesen (pymlg.params.ParameterCache)
+- die Zuordnung Quelle -> Kopie wird einmal als Liste von Paaren gebildet
+  (nicht `list(selected_ids)[i]` pro Kopie)
+- Phasen werden in einem Durchlauf gesetzt, unveränderte Werte übersprungen
+- der Schnappschuss kann auf beliebig viele Ziel-Level angewendet werden,
+  gemischte Auswahl wird nach Quell-Level gruppiert: ein CopyElements für
+  die ganze Auswahl (Hosts, Türen/Fenster und Beziehungen bleiben zusammen),
+  danach eine Verschiebung pro abweichender Gruppe
+"""
+
+from pymlg.params import ParameterCache
+
+try:
+    from Autodesk.Revit.DB import BuiltInParameter
+except ImportError:
+    # Ausserhalb von Revit (Benchmarks setzen einen Ersatz)
+    BuiltInParameter = None
+
+
+def snapshot(doc, element_ids):
+    """
+    Liest Phasen, Level und Base Offset aller Elemente in einem Durchlauf
+    Returns: ParameterCache (LEVEL_PARAM, WALL_BASE_CONSTRAINT, FAMILY_LEVEL_PARAM,
+             PHASE_CREATED, PHASE_DEMOLISHED, WALL_BASE_OFFSET)
+    """
+    cache = ParameterCache(doc, (
+        BuiltInParameter.LEVEL_PARAM,
+        BuiltInParameter.WALL_BASE_CONSTRAINT,
+        BuiltInParameter.FAMILY_LEVEL_PARAM,
+        BuiltInParameter.PHASE_CREATED,
+        BuiltInParameter.PHASE_DEMOLISHED,
+        BuiltInParameter.WALL_BASE_OFFSET,
+    ))
+    cache.load(element_ids)
+    return cache
+
+
+def source_level_id(snapshot, elem_id):
+    """Level eines Elements (LEVEL_PARAM, Base Constraint, Familien-Level) oder None"""
+    for bip in (BuiltInParameter.LEVEL_PARAM, BuiltInParameter.WALL_BASE_CONSTRAINT,
+                BuiltInParameter.FAMILY_LEVEL_PARAM):
+        level_id = snapshot.get(elem_id, bip)
+        if level_id and level_id.IntegerValue > 0:
+            return level_id
+    return None
+
+
+def host_map(doc, element_ids):
+    """
+    Host bzw. übergeordnete Familie abhängiger Elemente (Türen, Fenster, verschachtelte Familien)
+    Returns: dict {element_id (int): host_id (int)}
+    """
+    hosts = {}
+    for elem_id in element_ids:
+        elem = doc.GetElement(elem_id)
+        if elem is None:
+            continue
+        host = getattr(elem, "Host", None) or getattr(elem, "SuperComponent", None)
+        if host is not None:
+            hosts[elem_id.IntegerValue] = host.Id.IntegerValue
+    return hosts
+
+
+def _group_root(id_value, hosts, selected):
+    """Oberster ausgewählter Host eines Elements (das Element selbst ohne Host in der Auswahl)"""
+    seen = set()
+    while id_value in hosts and hosts[id_value] in selected and id_value not in seen:
+        seen.add(id_value)
+        id_value = hosts[id_value]
+    return id_value
+
+
+def group_by_level(snapshot, element_ids, hosts=None):
+    """
+    Gruppiert die Elemente nach ihrem Quell-Level (Reihenfolge bleibt erhalten)
+    hosts: host_map(); abhängige Elemente kommen in die Gruppe ihres
+           ausgewählten Hosts, auch wenn ihr eigenes Level abweicht oder fehlt
+    Returns: list [(level_id|None, [element_id, ...])]
+    """
+    hosts = hosts or {}
+    element_ids = list(element_ids)
+    by_value = dict((elem_id.IntegerValue, elem_id) for elem_id in element_ids)
+
+    groups = []
+    group_index = {}
+    for elem_id in element_ids:
+        root = _group_root(elem_id.IntegerValue, hosts, by_value)
+        level_id = source_level_id(snapshot, by_value[root])
+        key = level_id.IntegerValue if level_id else None
+        if key not in group_index:
+            group_index[key] = len(groups)
+            groups.append((level_id, []))
+        groups[group_index[key]][1].append(elem_id)
+    return groups
+
+
+def pair_copies(source_ids, copied_ids):
+    """
+    Ordnet Quellen und Kopien einmalig zu (gleiche Reihenfolge wie CopyElements)
+    Returns: list [(source_id, copy_id)]
+    """
+    source_ids = list(source_ids)
+    copied_ids = list(copied_ids)
+    if len(source_ids) != len(copied_ids):
+        raise ValueError("CopyElements: {} Quellen, aber {} Kopien - Zuordnung nicht eindeutig".format(
+            len(source_ids), len(copied_ids)))
+    return list(zip(source_ids, copied_ids))
+
+
+def copy_elements(doc, source_ids, translation):
+    """
+    Kopiert die Elemente mit einer Verschiebung (innerhalb einer Transaction)
+    Returns: list [(source_id, copy_id)]
+    """
+    from Autodesk.Revit.DB import ElementId, ElementTransformUtils
+    from System.Collections.Generic import List
+
+    source_list = list(source_ids)
+    copied_ids = ElementTransformUtils.CopyElements(doc, List[ElementId](source_list), translation)
+    return pair_copies(source_list, copied_ids)
+
+
+def copy_level_groups(doc, groups, z_offsets):
+    """
+    Kopiert alle Gruppen in einem CopyElements (mit der Verschiebung der ersten
+    Gruppe) und verschiebt danach die Kopien abweichender Gruppen
+    groups: group_by_level(), z_offsets: Z-Verschiebung pro Gruppe (Fuß)
+    Returns: list [(source_id, copy_id)]
+    """
+    from Autodesk.Revit.DB import ElementId, ElementTransformUtils, XYZ
+    from System.Collections.Generic import List
+
+    base_offset = z_offsets[0] if z_offsets else 0.0
+    pairs = copy_elements(doc, [elem_id for _, ids in groups for elem_id in ids], XYZ(0, 0, base_offset))
+    copy_of = dict((source_id.IntegerValue, copy_id) for source_id, copy_id in pairs)
+
+    for (_, ids), z_offset in zip(groups, z_offsets):
+        delta = z_offset - base_offset
+        if abs(delta) > 1e-9:
+            ElementTransformUtils.MoveElements(
+                doc, List[ElementId]([copy_of[elem_id.IntegerValue] for elem_id in ids]), XYZ(0, 0, delta))
+    return pairs
+
+
+def apply_phases(doc, pairs, snapshot):
+    """
+    Überträgt die Phasen der Quellen (aus snapshot()) auf die Kopien
+    Returns: Anzahl geschriebener Parameter
+    """
+    phase_bips = (BuiltInParameter.PHASE_CREATED, BuiltInParameter.PHASE_DEMOLISHED)
+
+    written = 0
+    for source_id, copy_id in pairs:
+        copied_elem = None
+        for bip in phase_bips:
+            phase_id = snapshot.get(source_id, bip)
+            if not phase_id:
+                continue
+            if copied_elem is None:
+                copied_elem = doc.GetElement(copy_id)
+            param = copied_elem.get_Parameter(bip)
+            if param and not param.IsReadOnly and param.AsElementId() != phase_id:
+                param.Set(phase_id)
+                written += 1
+
+    return written
+
+
+def assign_level(doc, pairs, level_id, snapshot):
+    """
+    Setzt Level (und bei Wänden Base Constraint + Original-Base-Offset) der Kopien
+    Returns: Anzahl bearbeiteter Kopien
+    """
+    level_bips = (BuiltInParameter.LEVEL_PARAM, BuiltInParameter.WALL_BASE_CONSTRAINT)
+    offset_bip = BuiltInParameter.WALL_BASE_OFFSET
+
+    count = 0
+    for source_id, copy_id in pairs:
+        copied_elem = doc.GetElement(copy_id)
+        if not copied_elem:
+            continue
+
+        for bip in level_bips:
+            param = copied_elem.get_Parameter(bip)
+            if param and not param.IsReadOnly:
+                param.Set(level_id)
+
+        offset = snapshot.get(source_id, offset_bip)
+        if offset is not None:
+            param = copied_elem.get_Parameter(offset_bip)
+            if param and not param.IsReadOnly:
+                param.Set(offset)
+        count += 1
+
+    return count
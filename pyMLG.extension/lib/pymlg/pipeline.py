@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Zweistufige Pipeline: Revit-Thread extrahiert, Worker-Threads verarbeiten
+
+Die Revit-API darf nur im Haupt-Thread benutzt werden. `extract` läuft deshalb
+immer im aufrufenden Thread und liefert reine Python-Daten; `process`
+(Formatierung, Typ-Konvertierung, Datei schreiben) läuft im Thread-Pool,
+so dass Element N+1 schon extrahiert wird, während N noch geschrieben wird.
+"""
+
+import threading
+import time
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+DEFAULT_WORKERS = 4
+
+_STOP = object()
+
+
+class PipelineStats(object):
+    """Zeitmessung einer Pipeline (Sekunden)"""
+
+    def __init__(self):
+        self.items = 0
+        self.extract_time = 0.0
+        self.process_time = 0.0
+        self.wall_time = 0.0
+        self._lock = threading.Lock()
+
+    def add_process_time(self, seconds):
+        with self._lock:
+            self.process_time += seconds
+
+    @property
+    def sequential_time(self):
+        """Geschätzte Dauer ohne Überlappung (Extraktion + Verarbeitung)"""
+        return self.extract_time + self.process_time
+
+    @property
+    def gain(self):
+        return max(self.sequential_time - self.wall_time, 0.0)
+
+    def summary(self):
+        return "{} Elemente in {:.2f} s (sequenziell ~{:.2f} s, Gewinn {:.2f} s)".format(
+            self.items, self.wall_time, self.sequential_time, self.gain)
+
+
+def run_pipeline(items, extract, process, workers=DEFAULT_WORKERS):
+    """
+    Führt extract(item) im aktuellen Thread und process(item, data) im Pool aus
+    workers=0 verarbeitet alles nacheinander im aktuellen Thread.
+    Der erste Fehler aus einem Worker wird nach Abschluss erneut ausgelöst.
+    Returns: PipelineStats
+    """
+    stats = PipelineStats()
+    errors = []
+    start = time.time()
+
+    def timed_process(item, data):
+        t0 = time.time()
+        try:
+            process(item, data)
+        finally:
+            stats.add_process_time(time.time() - t0)
+
+    def worker(tasks):
+        while True:
+            task = tasks.get()
+            if task is _STOP:
+                return
+            try:
+                timed_process(*task)
+            except Exception as e:
+                errors.append(e)
+
+    # Begrenzte Queue, damit die Extraktion nicht beliebig vorausläuft
+    tasks = queue.Queue(maxsize=max(workers, 1) * 2)
+    threads = []
+    for _ in range(workers):
+        thread = threading.Thread(target=worker, args=(tasks,))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    try:
+        for item in items:
+            t0 = time.time()
+            data = extract(item)
+            stats.extract_time += time.time() - t0
+            stats.items += 1
+
+            if threads:
+                tasks.put((item, data))
+            else:
+                timed_process(item, data)
+    finally:
+        for _ in threads:
+            tasks.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    stats.wall_time = time.time() - start
+
+    if errors:
+        raise errors[0]
+    return stats
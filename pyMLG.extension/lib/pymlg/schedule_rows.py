@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Exakte Zuordnung Schedule-Body-Zeile -> Element-Id
+
+Die Revit-API liefert keine Zeilen-Elemente. Deshalb wird in einer
+Transaction, die immer zurückgerollt wird, die Element-Id als Schlüssel in
+den Parameter "Kommentare" jedes Elements geschrieben, das Feld (falls
+nötig) zum Schedule hinzugefügt und die Spalte einmal gelesen.
+Gruppierungs-, Summen- und Leerzeilen haben keinen Schlüssel und bleiben
+unzugeordnet; Sortierung und Gruppierung spielen keine Rolle. Elemente, deren
+Kommentar nicht geschrieben werden kann (Gruppe, anderer Bearbeiter), bleiben
+ebenfalls unzugeordnet; scheitert die Transaction selbst (z.B. schreibgeschütztes
+Dokument), gibt es keinen Index und der Aufrufer nutzt seinen Fallback.
+In Worksharing-Modellen wird der Index nur gebaut, wenn alle Elemente bereits
+dem Benutzer gehören: das Schreiben würde sie sonst aus dem Zentralmodell
+ausleihen (Netzwerkzugriff pro Element, der Export wäre nicht mehr nur lesend).
+"""
+
+KEY_PREFIX = u"#pymlg:"
+
+
+def parse_row_keys(texts):
+    """
+    Wertet die Texte der Schlüsselspalte aus
+    texts: Zellentexte der Schlüsselspalte in Body-Reihenfolge
+    Returns: dict {body_zeile: element_id (int)}
+    """
+    rows = {}
+    prefix_len = len(KEY_PREFIX)
+
+    for row, text in enumerate(texts):
+        if not text or not text.startswith(KEY_PREFIX):
+            continue
+        try:
+            rows[row] = int(text[prefix_len:])
+        except ValueError:
+            continue
+
+    return rows
+
+
+class ScheduleRowIndex(object):
+    """Zeilen-Index eines Schedules"""
+
+    def __init__(self, schedule_id, row_to_id):
+        self.schedule_id = schedule_id
+        self.row_to_id = row_to_id
+        self.id_to_row = dict((elem_id, row) for row, elem_id in row_to_id.items())
+
+    def __len__(self):
+        return len(self.row_to_id)
+
+    def element_id(self, row):
+        """Element-Id (int) einer Body-Zeile oder None"""
+        return self.row_to_id.get(row)
+
+    def element_rows(self):
+        """Alle Element-Zeilen aufsteigend"""
+        return sorted(self.row_to_id)
+
+    def elements(self, doc):
+        """
+        Holt die Elemente einmal pro Id
+        Returns: dict {body_zeile: element}
+        """
+        from Autodesk.Revit.DB import ElementId
+
+        result = {}
+        for row, elem_id in self.row_to_id.items():
+            element = doc.GetElement(ElementId(elem_id))
+            if element:
+                result[row] = element
+        return result
+
+
+def _find_comment_field(definition, comment_param_id):
+    """Sucht das Kommentar-Feld im Schedule oder in den verfügbaren Feldern"""
+    for index in range(definition.GetFieldCount()):
+        field = definition.GetField(index)
+        if field.ParameterId == comment_param_id:
+            return field, None
+
+    for schedulable in definition.GetSchedulableFields():
+        if schedulable.ParameterId == comment_param_id:
+            return None, schedulable
+
+    return None, None
+
+
+def _field_is_used(definition, field_id):
+    """True wenn Filter oder Sortierung/Gruppierung das Feld benutzen"""
+    for schedule_filter in definition.GetFilters():
+        if schedule_filter.FieldId == field_id:
+            return True
+    for sort_group in definition.GetSortGroupFields():
+        if sort_group.FieldId == field_id:
+            return True
+    return False
+
+
+def _visible_column(definition, field_id):
+    column = 0
+    for index in range(definition.GetFieldCount()):
+        field = definition.GetField(index)
+        if field.FieldId == field_id:
+            return column
+        if not field.IsHidden:
+            column += 1
+    return None
+
+
+def _owned_by_user(doc, element_ids):
+    """True wenn alle Elemente schon dem aktuellen Benutzer gehören (lokale Abfrage)"""
+    from Autodesk.Revit.DB import CheckoutStatus, WorksharingUtils
+
+    for elem_id in element_ids:
+        if WorksharingUtils.GetCheckoutStatus(doc, elem_id) != CheckoutStatus.OwnedByCurrentUser:
+            return False
+    return True
+
+
+def _write_key(doc, elem_id, comment_bip):
+    """Schreibt den Schlüssel; False, wenn das Element gesperrt/schreibgeschützt ist"""
+    try:
+        param = doc.GetElement(elem_id).get_Parameter(comment_bip)
+        if param and not param.IsReadOnly:
+            param.Set(u"{}{}".format(KEY_PREFIX, elem_id.IntegerValue))
+            return True
+    except Exception:
+        pass
+    return False
+
+
+def build_row_index(doc, schedule):
+    """
+    Baut den Zeilen-Index eines Schedules (einmal pro Schedule)
+    Muss ausserhalb einer offenen Transaction aufgerufen werden.
+    Returns: ScheduleRowIndex oder None, wenn der Schedule nicht einzeln
+             auflistet, keinen Kommentar-Parameter hat, darauf filtert/sortiert,
+             Elemente aus dem Zentralmodell ausleihen müsste oder die
+             Transaction nicht möglich ist
+    """
+    from Autodesk.Revit.DB import (BuiltInParameter, ElementId, FilteredElementCollector,
+                                   SectionType, Transaction, TransactionStatus)
+
+    comment_bip = BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS
+    comment_param_id = ElementId(comment_bip)
+    definition = schedule.Definition
+
+    # Ohne "Jede Instanz auflisten" würde die Schlüsselspalte Zeilen aufteilen
+    if not definition.IsItemized:
+        return None
+
+    field, schedulable = _find_comment_field(definition, comment_param_id)
+    if field is None and schedulable is None:
+        return None
+    if field is not None and _field_is_used(definition, field.FieldId):
+        return None
+
+    element_ids = FilteredElementCollector(doc, schedule.Id).ToElementIds()
+
+    # Worksharing: nicht ausgeliehene Elemente würden beim Schreiben ausgeliehen
+    if doc.IsWorkshared and not _owned_by_user(doc, element_ids):
+        return None
+
+    t = Transaction(doc, "Schedule-Zeilenindex")
+    try:
+        if t.Start() != TransactionStatus.Started:
+            return None
+    except Exception:
+        return None
+
+    try:
+        written = 0
+        for elem_id in element_ids:
+            written += _write_key(doc, elem_id, comment_bip)
+        if not written:
+            return None
+
+        if field is None:
+            field = definition.AddField(schedulable)
+        field.IsHidden = False
+        doc.Regenerate()
+
+        column = _visible_column(definition, field.FieldId)
+        body = schedule.GetTableData().GetSectionData(SectionType.Body)
+        texts = [body.GetCellText(row, column) for row in range(body.NumberOfRows)]
+    except Exception:
+        return None
+    finally:
+        if t.HasStarted() and not t.HasEnded():
+            t.RollBack()
+
+    return ScheduleRowIndex(schedule.Id, parse_row_keys(texts))
+
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Spaltenweiser Schnappschuss eines Schedule-Abschnitts
+
+Feld-Definitionen und Parameter werden einmal pro Spalte aufgelöst (nicht pro
+Zelle). Die Zellentexte liegen spaltenweise dictionary-kodiert vor: jede
+Spalte hält die eindeutigen Texte einmal und pro Zeile nur einen int-Code
+in einem array('i').
+"""
+
+from array import array
+
+
+class TextColumn(object):
+    """Dictionary-kodierte Textspalte"""
+
+    def __init__(self):
+        self.values = [u""]
+        self.codes = array('i')
+        self._lookup = {u"": 0}
+
+    def _code(self, text):
+        code = self._lookup.get(text)
+        if code is None:
+            code = len(self.values)
+            self.values.append(text)
+            self._lookup[text] = code
+        return code
+
+    def append(self, text):
+        self.codes.append(self._code(text or u""))
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __setitem__(self, row, text):
+        self.codes[row] = self._code(text or u"")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.values
+        for code in self.codes:
+            yield values[code]
+
+
+class ColumnInfo(object):
+    """Einmal aufgelöste Feld-Informationen einer Spalte"""
+
+    __slots__ = ('index', 'field', 'parameter_id', 'parameter_key')
+
+    def __init__(self, index, field=None, parameter_id=None, parameter_key=None):
+        self.index = index
+        self.field = field
+        self.parameter_id = parameter_id
+        # BuiltInParameter oder Definition, direkt nutzbar mit element.get_Parameter()
+        self.parameter_key = parameter_key
+
+
+def resolve_columns(schedule, n_cols):
+    """
+    Ordnet die sichtbaren Schedule-Felder den Body-Spalten zu
+    Returns: list[ColumnInfo] mit Länge n_cols
+    """
+    import System
+    from Autodesk.Revit.DB import BuiltInParameter, ElementId, ParameterElement
+
+    definition = schedule.Definition
+    fields = [definition.GetField(i) for i in range(definition.GetFieldCount())]
+    visible_fields = [field for field in fields if not field.IsHidden]
+
+    # Versteckte Felder erscheinen nicht als Spalte
+    if len(visible_fields) != n_cols:
+        visible_fields = fields
+
+    columns = []
+    for col in range(n_cols):
+        field = visible_fields[col] if col < len(visible_fields) else None
+        param_id = field.ParameterId if field else ElementId.InvalidElementId
+        key = None
+
+        if param_id != ElementId.InvalidElementId:
+            id_value = param_id.IntegerValue
+            if id_value < 0:
+                key = System.Enum.ToObject(BuiltInParameter, id_value)
+            else:
+                param_elem = schedule.Document.GetElement(param_id)
+                if isinstance(param_elem, ParameterElement):
+                    key = param_elem.GetDefinition()
+
+        columns.append(ColumnInfo(col, field, param_id, key))
+
+    return columns
+
+
+def parameter_text(param):
+    """Text eines Parameters wie im Schedule (String/Zahl/Element-Id)"""
+    from Autodesk.Revit.DB import StorageType
+
+    if not param or not param.HasValue:
+        return u""
+    if param.StorageType == StorageType.String:
+        return param.AsString() or u""
+    if param.StorageType == StorageType.Integer:
+        return str(param.AsInteger())
+    return param.AsValueString() or u""
+
+
+class ScheduleSnapshot(object):
+    """Schnappschuss eines Schedule-Abschnitts (Spalten als TextColumn)"""
+
+    def __init__(self, columns, n_rows, column_info=None):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.column_info = column_info or [ColumnInfo(i) for i in range(len(columns))]
+
+    @property
+    def n_cols(self):
+        return len(self.columns)
+
+    @classmethod
+    def from_section(cls, section_data, column_info=None):
+        """Liest jede Zelle genau einmal mit GetCellText"""
+        if not section_data:
+            return cls([], 0, column_info)
+
+        n_rows = section_data.NumberOfRows
+        n_cols = section_data.NumberOfColumns
+
+        columns = [TextColumn() for _ in range(n_cols)]
+        for row in range(n_rows):
+            for col, column in enumerate(columns):
+                column.append(section_data.GetCellText(row, col))
+
+        return cls(columns, n_rows, column_info)
+
+    @classmethod
+    def from_schedule(cls, schedule):
+        """Body-Abschnitt einer ViewSchedule inkl. aufgelöster Feld-Definitionen"""
+        from Autodesk.Revit.DB import SectionType
+
+        body = schedule.GetTableData().GetSectionData(SectionType.Body)
+        column_info = resolve_columns(schedule, body.NumberOfColumns)
+        return cls.from_section(body, column_info)
+
+    def cell(self, row, col):
+        return self.columns[col][row]
+
+    def set_cell(self, row, col, text):
+        self.columns[col][row] = text
+
+    def iter_column(self, col):
+        return iter(self.columns[col])
+
+    def iter_rows(self):
+        """Zeilen als Liste von Texten (für die Writer)"""
+        columns = [(column.values, column.codes) for column in self.columns]
+        for row in range(self.n_rows):
+            yield [values[codes[row]] for values, codes in columns]
+
+    def fill_missing(self, row_elements, params=None):
+        """
+        Füllt leere Zellen von Element-Zeilen direkt aus den Element-Parametern
+        row_elements: dict {body_zeile: element}
+        params: optional ParameterCache(reader=parameter_text), z.B. über
+                mehrere Schedules geteilt - jedes (Element, Parameter) wird
+                dann nur einmal gelesen
+        Returns: Anzahl gefüllter Zellen
+        """
+        filled = 0
+        columns = [(info, self.columns[info.index]) for info in self.column_info
+                   if info.parameter_key is not None]
+
+        for row, element in row_elements.items():
+            for info, column in columns:
+                if column.codes[row] != 0:
+                    continue
+                if params is not None:
+                    text = params.get(element, info.parameter_key, u"")
+                else:
+                    try:
+                        text = parameter_text(element.get_Parameter(info.parameter_key))
+                    except Exception:
+                        text = u""
+                if text:
+                    column[row] = text
+                    filled += 1
+
+        return filled
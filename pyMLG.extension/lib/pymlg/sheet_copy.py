@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Sheets mit Inhalt duplizieren
+
+Viewports, Schedule-Instanzen und Annotationen aller gewählten Sheets werden
+in einem einzigen Collector-Durchlauf gesammelt (statt einem view-bezogenen
+Collector pro Sheet) und dann pro neuem Sheet angelegt. Jeder Viewport hat
+eine eigene SubTransaction (keine verwaisten View-Duplikate bei Fehlern).
+"""
+
+
+def titleblock_type_index(doc):
+    """
+    Ein Collector über alle Plankopf-Instanzen im Projekt
+    Returns: dict {owner_view_id (int): titleblock_type_id}
+    """
+    from Autodesk.Revit.DB import BuiltInCategory, FilteredElementCollector
+
+    index = {}
+    collector = FilteredElementCollector(doc) \
+        .OfCategory(BuiltInCategory.OST_TitleBlocks) \
+        .WhereElementIsNotElementType()
+
+    for titleblock in collector:
+        owner = titleblock.OwnerViewId.IntegerValue
+        if owner not in index:
+            index[owner] = titleblock.GetTypeId()
+    return index
+
+
+class SheetContents(object):
+    """Inhalt eines Sheets, gruppiert nach Art"""
+
+    def __init__(self):
+        self.viewports = []
+        self.schedules = []
+        self.annotation_ids = []
+
+
+class CopyResult(object):
+    def __init__(self):
+        self.views = 0
+        self.schedules = 0
+        self.annotations = 0
+        self.errors = []
+
+
+def collect_sheet_contents(doc, sheets):
+    """
+    Sammelt den Inhalt aller Sheets in einem Collector-Durchlauf
+    Returns: dict {sheet_id (int): SheetContents}
+    """
+    from Autodesk.Revit.DB import (BuiltInCategory, ElementFilter, ElementOwnerViewFilter,
+                                   FilteredElementCollector, LogicalOrFilter, ScheduleSheetInstance,
+                                   Viewport)
+    from System.Collections.Generic import List
+
+    contents = dict((sheet.Id.IntegerValue, SheetContents()) for sheet in sheets)
+    if not contents:
+        return contents
+
+    owner_filters = List[ElementFilter]([ElementOwnerViewFilter(sheet.Id) for sheet in sheets])
+    owner_filter = owner_filters[0] if owner_filters.Count == 1 else LogicalOrFilter(owner_filters)
+
+    # Plankopf kommt über ViewSheet.Create (Typ aus titleblock_type_index)
+    skipped_cats = set([int(BuiltInCategory.OST_Viewports), int(BuiltInCategory.OST_ScheduleGraphics),
+                        int(BuiltInCategory.OST_TitleBlocks)])
+
+    collector = FilteredElementCollector(doc).WhereElementIsNotElementType().WherePasses(owner_filter)
+    for elem in collector:
+        bucket = contents.get(elem.OwnerViewId.IntegerValue)
+        if bucket is None:
+            continue
+
+        if isinstance(elem, Viewport):
+            bucket.viewports.append(elem)
+        elif isinstance(elem, ScheduleSheetInstance):
+            if not elem.IsTitleblockRevisionSchedule:
+                bucket.schedules.append(elem)
+        elif elem.Category is None:
+            continue
+        elif elem.Category.Id.IntegerValue not in skipped_cats:
+            bucket.annotation_ids.append(elem.Id)
+
+    return contents
+
+
+def _place_view(doc, viewport, new_sheet, view_names):
+    """Dupliziert die View eines Viewports (Legenden werden wiederverwendet) und platziert sie"""
+    from Autodesk.Revit.DB import ViewDuplicateOption, ViewType, Viewport
+
+    view = doc.GetElement(viewport.ViewId)
+
+    if view.ViewType == ViewType.Legend:
+        view_id = view.Id
+    else:
+        option = ViewDuplicateOption.WithDetailing
+        if not view.CanViewBeDuplicated(option):
+            option = ViewDuplicateOption.Duplicate
+        view_id = view.Duplicate(option)
+        doc.GetElement(view_id).Name = view_names.next_free(view.Name)
+
+    new_viewport = Viewport.Create(doc, new_sheet.Id, view_id, viewport.GetBoxCenter())
+    if new_viewport.GetTypeId() != viewport.GetTypeId():
+        new_viewport.ChangeTypeId(viewport.GetTypeId())
+    return new_viewport
+
+
+def copy_sheet_contents(doc, sheet, new_sheet, contents, view_names):
+    """
+    Überträgt Views, Schedules und Annotationen von `sheet` auf `new_sheet`
+    Muss innerhalb einer offenen Transaction laufen.
+    Returns: CopyResult
+    """
+    from Autodesk.Revit.DB import (CopyPasteOptions, ElementId, ElementTransformUtils,
+                                   ScheduleSheetInstance, SubTransaction, Transform)
+    from System.Collections.Generic import List
+
+    result = CopyResult()
+
+    for viewport in contents.viewports:
+        # Eigene SubTransaction: scheitert die Platzierung, verschwindet auch die duplizierte View
+        sub = SubTransaction(doc)
+        sub.Start()
+        try:
+            _place_view(doc, viewport, new_sheet, view_names)
+            sub.Commit()
+            result.views += 1
+        except Exception as e:
+            if sub.HasStarted() and not sub.HasEnded():
+                sub.RollBack()
+            result.errors.append("View {}: {}".format(viewport.ViewId.IntegerValue, e))
+
+    for instance in contents.schedules:
+        try:
+            ScheduleSheetInstance.Create(doc, new_sheet.Id, instance.ScheduleId, instance.Point)
+            result.schedules += 1
+        except Exception as e:
+            result.errors.append("Schedule {}: {}".format(instance.ScheduleId.IntegerValue, e))
+
+    if contents.annotation_ids:
+        try:
+            copied = ElementTransformUtils.CopyElements(
+                sheet, List[ElementId](contents.annotation_ids), new_sheet,
+                Transform.Identity, CopyPasteOptions())
+            result.annotations += copied.Count
+        except Exception as e:
+            result.errors.append("Annotationen: {}".format(e))
+
+    return result
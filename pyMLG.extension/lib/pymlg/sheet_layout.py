@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Verteilung von Ansichten auf Sheets (Regal-Packverfahren, reine Geometrie)
+
+First-Fit-Decreasing-Height: Ansichten nach Höhe absteigend, jede kommt ins
+erste Regal (Zeile) eines offenen Sheets, in das sie passt; sonst neues Regal
+unten anfügen, sonst neues Sheet. Koordinaten relativ zur linken oberen Ecke
+des Layout-Bereichs, y nach unten.
+"""
+
+
+class Placement(object):
+    """Eine Ansicht auf einem Sheet (Mittelpunkt relativ zum Bereich)"""
+
+    __slots__ = ('key', 'x', 'y', 'width', 'height')
+
+    def __init__(self, key, x, y, width, height):
+        self.key = key
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class _Shelf(object):
+    __slots__ = ('top', 'height', 'used_width')
+
+    def __init__(self, top, height):
+        self.top = top
+        self.height = height
+        self.used_width = 0.0
+
+
+class _Sheet(object):
+    def __init__(self):
+        self.shelves = []
+        self.placements = []
+        self.used_height = 0.0
+
+
+def pack_shelves(items, area_width, area_height, gap=0.0, max_per_sheet=0):
+    """
+    items: Liste (key, breite, höhe)
+    gap: Abstand zwischen Ansichten und zum Rand des Bereichs
+    max_per_sheet: höchstens so viele Ansichten pro Sheet (0 = unbegrenzt)
+    Zu große Ansichten bekommen ein eigenes Sheet (mittig im Bereich).
+    Returns: list[list[Placement]] - ein Eintrag pro Sheet
+    """
+    sheets = []
+    order = sorted(range(len(items)), key=lambda i: (-items[i][2], i))
+
+    for index in order:
+        key, width, height = items[index]
+
+        if width + 2 * gap > area_width or height + 2 * gap > area_height:
+            sheet = _Sheet()
+            sheet.placements.append(Placement(key, area_width / 2.0, area_height / 2.0, width, height))
+            sheet.used_height = area_height
+            sheets.append(sheet)
+            continue
+
+        if not _place(sheets, key, width, height, area_width, area_height, gap, max_per_sheet):
+            sheet = _Sheet()
+            sheets.append(sheet)
+            _place([sheet], key, width, height, area_width, area_height, gap, max_per_sheet)
+
+    return [sheet.placements for sheet in sheets]
+
+
+def _place(sheets, key, width, height, area_width, area_height, gap, max_per_sheet):
+    for sheet in sheets:
+        if max_per_sheet and len(sheet.placements) >= max_per_sheet:
+            continue
+        if sheet.used_height >= area_height and not sheet.shelves:
+            continue  # Sheet mit zu großer Ansicht
+
+        # Vorhandenes Regal mit Platz
+        for shelf in sheet.shelves:
+            if height + gap <= shelf.height and shelf.used_width + width + 2 * gap <= area_width:
+                _add(sheet, shelf, key, width, height, gap)
+                return True
+
+        # Neues Regal unter den bisherigen
+        if sheet.used_height + height + 2 * gap <= area_height:
+            shelf = _Shelf(sheet.used_height, height + gap)
+            sheet.shelves.append(shelf)
+            sheet.used_height += height + gap
+            _add(sheet, shelf, key, width, height, gap)
+            return True
+
+    return False
+
+
+def _add(sheet, shelf, key, width, height, gap):
+    x = shelf.used_width + gap + width / 2.0
+    y = shelf.top + gap + height / 2.0
+    shelf.used_width += width + gap
+    sheet.placements.append(Placement(key, x, y, width, height))
+
+
+def fill_ratio(sheets, area_width, area_height):
+    """Anteil der belegten Fläche über alle Sheets"""
+    if not sheets:
+        return 0.0
+    used = sum(p.width * p.height for placements in sheets for p in placements)
+    return used / (len(sheets) * area_width * area_height)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""Überlappungsfreie Anordnung von Wall Tags (reine Geometrie, ohne Revit)
+
+Die Tag-Rechtecke (Grundriss, achsparallel) werden in einem Raster
+(Spatial Hash) gehalten: eine Abfrage prüft nur die Tags in den berührten
+Zellen, nicht alle bereits platzierten. Jedes Tag bekommt die erste freie
+Position aus:
+    1. aktuelle Position
+    2. entlang der Wand verschoben (+1, -1, +2, -2, ... Schritte)
+    3. dasselbe auf der anderen Wandseite
+Findet sich nichts, bleibt das Tag an der Ausgangsposition (unresolved).
+Bei begrenzter Dichte ist der Aufwand linear in der Anzahl Tags.
+"""
+
+from collections import defaultdict
+
+from pymlg.tag_solver import ELBOW_RATIO
+
+# Status je Tag
+KEPT = "kept"
+SLID = "slid"
+FLIPPED = "flipped"
+UNRESOLVED = "unresolved"
+
+
+class TagSpec(object):
+    """
+    Ein Tag vor der Anordnung
+    head: Tag-Kopf (x, y, z) im gewünschten Abstand zur Wand
+    start, end: Wandlinie (x, y, z)
+    half_width, half_height: halbe Ausdehnung des Tags im Grundriss
+    """
+
+    __slots__ = ('head', 'start', 'end', 'half_width', 'half_height')
+
+    def __init__(self, head, start, end, half_width, half_height):
+        self.head = head
+        self.start = start
+        self.end = end
+        self.half_width = half_width
+        self.half_height = half_height
+
+
+class SpatialGrid(object):
+    """Raster aus Zellen mit Kantenlänge cell_size, Inhalt: Rechtecke"""
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._cells = defaultdict(list)
+        self._boxes = []
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        x0, y0, x1, y1 = box
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, box):
+        index = len(self._boxes)
+        self._boxes.append(box)
+        for cell in self._cell_range(box):
+            self._cells[cell].append(index)
+        return index
+
+    def overlaps(self, box):
+        """True, wenn box ein eingefügtes Rechteck schneidet"""
+        x0, y0, x1, y1 = box
+        boxes = self._boxes
+        for cell in self._cell_range(box):
+            for index in self._cells.get(cell, ()):
+                bx0, by0, bx1, by1 = boxes[index]
+                if x0 < bx1 and bx0 < x1 and y0 < by1 and by0 < y1:
+                    return True
+        return False
+
+
+class LayoutResult(object):
+    def __init__(self):
+        self.heads = []
+        self.elbows = []
+        self.status = []
+
+    def count(self, status):
+        return self.status.count(status)
+
+    def summary(self):
+        return "{} unverändert, {} verschoben, {} Seite gewechselt, {} ungelöst".format(
+            self.count(KEPT), self.count(SLID), self.count(FLIPPED), self.count(UNRESOLVED))
+
+
+def _box(x, y, spec):
+    return (x - spec.half_width, y - spec.half_height, x + spec.half_width, y + spec.half_height)
+
+
+def _candidates(spec, step, max_slides, allow_flip):
+    """Mögliche Kopf-/Knickpositionen (x, y, elbow_x, elbow_y, status) in Prüfreihenfolge"""
+    hx, hy = spec.head[0], spec.head[1]
+    ax, ay = spec.start[0], spec.start[1]
+    sx, sy = spec.end[0] - ax, spec.end[1] - ay
+    length = (sx * sx + sy * sy) ** 0.5
+
+    if length > 0:
+        ux, uy = sx / length, sy / length
+        t = min(max(((hx - ax) * ux + (hy - ay) * uy) / length, 0.0), 1.0)
+    else:
+        ux, uy, t = 1.0, 0.0, 0.0
+    cx, cy = ax + sx * t, ay + sy * t
+
+    nx, ny = hx - cx, hy - cy
+    offset = (nx * nx + ny * ny) ** 0.5
+    if offset > 0:
+        nx, ny = nx / offset, ny / offset
+    else:
+        nx, ny = -uy, ux
+
+    shifts = [0.0]
+    for k in range(1, max_slides + 1):
+        shifts.extend((k * step, -k * step))
+
+    sides = [(nx, ny, False)]
+    if allow_flip and offset > 0:
+        sides.append((-nx, -ny, True))
+
+    for side_x, side_y, flipped in sides:
+        for shift in shifts:
+            if shift and (length <= 0 or not 0.0 <= t + shift / length <= 1.0):
+                continue
+            px, py = cx + ux * shift, cy + uy * shift
+            status = FLIPPED if flipped else (SLID if shift else KEPT)
+            yield (px + side_x * offset, py + side_y * offset,
+                   px + side_x * offset * ELBOW_RATIO, py + side_y * offset * ELBOW_RATIO, status)
+
+
+def layout_tags(specs, step=None, max_slides=4, allow_flip=True):
+    """
+    Ordnet die Tags nacheinander überlappungsfrei an
+    step: Verschiebung entlang der Wand pro Versuch (Standard: größte Tag-Breite)
+    Returns: LayoutResult (heads/elbows als (x, y, z), status je Tag)
+    """
+    result = LayoutResult()
+    if not specs:
+        return result
+
+    largest = max(max(spec.half_width, spec.half_height) for spec in specs) * 2.0
+    if step is None:
+        step = max(spec.half_width for spec in specs) * 2.0
+    grid = SpatialGrid(largest or 1.0)
+
+    for spec in specs:
+        z = spec.head[2]
+        chosen = None
+        for candidate in _candidates(spec, step, max_slides, allow_flip):
+            if not grid.overlaps(_box(candidate[0], candidate[1], spec)):
+                chosen = candidate
+                break
+
+        if chosen is None:
+            x, y = spec.head[0], spec.head[1]
+            elbow = next(_candidates(spec, step, 0, False))
+            chosen = (x, y, elbow[2], elbow[3], UNRESOLVED)
+
+        x, y, ex, ey, status = chosen
+        grid.insert(_box(x, y, spec))
+        result.heads.append((x, y, z))
+        result.elbows.append((ex, ey, z))
+        result.status.append(status)
+
+    return result
+
+
+def count_overlaps(heads, specs):
+    """Anzahl Tags, die ein vorher platziertes Tag schneiden (zur Kontrolle)"""
+    if not specs:
+        return 0
+    largest = max(max(spec.half_width, spec.half_height) for spec in specs) * 2.0
+    grid = SpatialGrid(largest or 1.0)
+    overlapping = 0
+    for head, spec in zip(heads, specs):
+        box = _box(head[0], head[1], spec)
+        if grid.overlaps(box):
+            overlapping += 1
+        grid.insert(box)
+    return overlapping
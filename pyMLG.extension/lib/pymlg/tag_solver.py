@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Batch-Löser für Wall-Tag-Abstände (reine Geometrie, ohne Revit)
+
+Für gerade Wände wird die Projektion des Tag-Kopfs auf die Wandlinie (auf das
+Segment begrenzt, wie Curve.Project) und die neue Kopf-/Knickpunkt-Position
+für alle Tags gemeinsam berechnet:
+    closest = Projektion(head)
+    richtung = normalize(closest - head)
+    head'   = closest - richtung * offset
+    elbow   = closest - richtung * offset * ELBOW_RATIO
+
+Mit NumPy (CPython) läuft das als Array-Rechnung, sonst (IronPython in
+pyRevit) als einfache Schleife ohne Revit-API-Aufrufe.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Knickpunkt des Leaders relativ zum Abstand
+ELBOW_RATIO = 0.7
+
+
+def _offsets(offset, n):
+    """Skalar oder ein Abstand pro Tag"""
+    if isinstance(offset, (int, float)):
+        return [float(offset)] * n
+    offsets = [float(value) for value in offset]
+    if len(offsets) != n:
+        raise ValueError("{} Abstände für {} Tags".format(len(offsets), n))
+    return offsets
+
+
+def solve_offsets(heads, starts, ends, offset, elbow_ratio=ELBOW_RATIO, use_numpy=None):
+    """
+    heads, starts, ends: Sequenzen von (x, y, z) - Tag-Kopf, Wandanfang, Wandende
+    offset: Abstand (Fuß), skalar oder pro Tag
+    use_numpy: None = automatisch, False = reine Python-Schleife erzwingen
+    Returns: (new_heads, elbows) als Listen von (x, y, z)
+    """
+    n = len(heads)
+    if len(starts) != n or len(ends) != n:
+        raise ValueError("heads/starts/ends müssen gleich lang sein")
+    if n == 0:
+        return [], []
+
+    offsets = _offsets(offset, n)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        return _solve_numpy(heads, starts, ends, offsets, elbow_ratio)
+    return _solve_python(heads, starts, ends, offsets, elbow_ratio)
+
+
+def _solve_numpy(heads, starts, ends, offsets, elbow_ratio):
+    h = np.asarray(heads, dtype=float)
+    a = np.asarray(starts, dtype=float)
+    b = np.asarray(ends, dtype=float)
+    d = np.asarray(offsets, dtype=float)[:, None]
+
+    seg = b - a
+    seg_len2 = np.einsum('ij,ij->i', seg, seg)
+    t = np.einsum('ij,ij->i', h - a, seg) / np.where(seg_len2 > 0, seg_len2, 1.0)
+    t = np.clip(np.where(seg_len2 > 0, t, 0.0), 0.0, 1.0)
+    closest = a + seg * t[:, None]
+
+    to_wall = closest - h
+    dist = np.sqrt(np.einsum('ij,ij->i', to_wall, to_wall))
+    direction = to_wall / np.where(dist > 0, dist, 1.0)[:, None]
+
+    new_heads = closest - direction * d
+    elbows = closest - direction * (d * elbow_ratio)
+    return new_heads.tolist(), elbows.tolist()
+
+
+def _solve_python(heads, starts, ends, offsets, elbow_ratio):
+    new_heads = []
+    elbows = []
+    for (hx, hy, hz), (ax, ay, az), (bx, by, bz), d in zip(heads, starts, ends, offsets):
+        sx, sy, sz = bx - ax, by - ay, bz - az
+        seg_len2 = sx * sx + sy * sy + sz * sz
+        t = 0.0
+        if seg_len2 > 0:
+            t = ((hx - ax) * sx + (hy - ay) * sy + (hz - az) * sz) / seg_len2
+            t = min(max(t, 0.0), 1.0)
+        cx, cy, cz = ax + sx * t, ay + sy * t, az + sz * t
+
+        wx, wy, wz = cx - hx, cy - hy, cz - hz
+        dist = (wx * wx + wy * wy + wz * wz) ** 0.5
+        if dist > 0:
+            wx, wy, wz = wx / dist, wy / dist, wz / dist
+
+        e = d * elbow_ratio
+        new_heads.append((cx - wx * d, cy - wy * d, cz - wz * d))
+        elbows.append((cx - wx * e, cy - wy * e, cz - wz * e))
+    return new_heads, elbows
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Vergleich von Filter-Überschreibungen (OverrideGraphicSettings)
+
+`override_signature` bildet ein OverrideGraphicSettings auf ein Tupel
+einfacher Werte ab. Gleiche Signatur = gleiche Darstellung, der Schreibzugriff
+(und die Regeneration der Vorlage) kann entfallen.
+"""
+
+# Lesbare Eigenschaften von OverrideGraphicSettings; je nach Revit-Version
+# fehlen einige (z.B. Surface*/Cut* Fill-Patterns erst ab 2019) -> None
+OVERRIDE_PROPERTIES = (
+    "Halftone",
+    "DetailLevel",
+    "Transparency",
+    "ProjectionLineColor",
+    "ProjectionLinePatternId",
+    "ProjectionLineWeight",
+    "CutLineColor",
+    "CutLinePatternId",
+    "CutLineWeight",
+    "IsSurfaceForegroundPatternVisible",
+    "SurfaceForegroundPatternColor",
+    "SurfaceForegroundPatternId",
+    "IsSurfaceBackgroundPatternVisible",
+    "SurfaceBackgroundPatternColor",
+    "SurfaceBackgroundPatternId",
+    "IsCutForegroundPatternVisible",
+    "CutForegroundPatternColor",
+    "CutForegroundPatternId",
+    "IsCutBackgroundPatternVisible",
+    "CutBackgroundPatternColor",
+    "CutBackgroundPatternId",
+    # Revit 2018 und älter
+    "ProjectionFillColor",
+    "ProjectionFillPatternId",
+    "IsProjectionFillPatternVisible",
+    "CutFillColor",
+    "CutFillPatternId",
+    "IsCutFillPatternVisible",
+)
+
+
+def _plain(value):
+    """Color/ElementId/Enum -> vergleichbarer Python-Wert"""
+    if value is None:
+        return None
+    if hasattr(value, "IntegerValue"):
+        return value.IntegerValue
+    if hasattr(value, "IsValid") and hasattr(value, "Red"):
+        return (value.Red, value.Green, value.Blue) if value.IsValid else None
+    if isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+def _read(overrides, name):
+    try:
+        return _plain(getattr(overrides, name, None))
+    except Exception:
+        return None
+
+
+def override_signature(overrides):
+    """
+    Vergleichbare Signatur eines OverrideGraphicSettings
+    Returns: tuple (ein Wert pro Eigenschaft aus OVERRIDE_PROPERTIES)
+    """
+    return tuple(_read(overrides, name) for name in OVERRIDE_PROPERTIES)
+
+
+class FilterState(object):
+    """Ein Filter einer Ansicht/Vorlage: Overrides, Sichtbarkeit, aktiviert"""
+
+    __slots__ = ('filter_id', 'name', 'overrides', 'signature', 'visible', 'enabled')
+
+    def __init__(self, filter_id, name, overrides, visible=True, enabled=None):
+        self.filter_id = filter_id
+        self.name = name
+        self.overrides = overrides
+        self.signature = override_signature(overrides)
+        self.visible = visible
+        # None: Revit-Version ohne GetIsFilterEnabled (vor 2021)
+        self.enabled = enabled
+
+    @property
+    def key(self):
+        return self.filter_id.IntegerValue
+
+
+def ordered_filter_ids(view):
+    """Filter in der Reihenfolge der Ansicht (GetOrderedFilters ab Revit 2021)"""
+    if hasattr(view, "GetOrderedFilters"):
+        return list(view.GetOrderedFilters())
+    return list(view.GetFilters())
+
+
+def read_filter_stack(doc, view):
+    """
+    Liest den kompletten Filter-Stapel einmal
+    Returns: list[FilterState] in Reihenfolge der Ansicht
+    """
+    has_enabled = hasattr(view, "GetIsFilterEnabled")
+    stack = []
+    for filter_id in ordered_filter_ids(view):
+        filter_elem = doc.GetElement(filter_id)
+        if not filter_elem:
+            continue
+        stack.append(FilterState(
+            filter_id,
+            filter_elem.Name,
+            view.GetFilterOverrides(filter_id),
+            view.GetFilterVisibility(filter_id),
+            view.GetIsFilterEnabled(filter_id) if has_enabled else None,
+        ))
+    return stack
+
+
+def _ordered_prefix(source_keys, target_keys):
+    """Länge des Anfangs der Quell-Reihenfolge, der im Ziel schon so vorliegt"""
+    source_set = set(source_keys)
+    common_target = [key for key in target_keys if key in source_set]
+    prefix = 0
+    for source_key, target_key in zip(source_keys, common_target):
+        if source_key != target_key:
+            break
+        prefix += 1
+    return prefix
+
+
+class FilterSyncError(Exception):
+    """Mindestens ein Filter konnte nicht übertragen werden (Vorlage zurückrollen)"""
+
+    def __init__(self, errors, counts=None):
+        Exception.__init__(self, u"; ".join(
+            u"Filter '{}': {}".format(state.name, e) for state, e in errors))
+        self.errors = errors
+        self.counts = counts
+
+
+def sync_filter_stack(view, source_stack, target_stack):
+    """
+    Bringt den Filter-Stapel von `view` auf den Stand der Quelle (in offener Transaction)
+    Geschrieben wird nur, was abweicht. Reihenfolge: Filter ab der ersten
+    Abweichung werden entfernt und in Quell-Reihenfolge neu angehängt;
+    zusätzliche Filter der Ziel-Vorlage bleiben erhalten.
+    Alle Filter werden versucht; scheitert einer, folgt danach FilterSyncError
+    (der Aufrufer rollt die Vorlage zurück, z.B. per SubTransaction).
+    Returns: dict added/updated/skipped/reordered/writes
+    """
+    counts = dict(added=0, updated=0, skipped=0, reordered=0, writes=0)
+    errors = []
+
+    target_by_key = dict((state.key, state) for state in target_stack)
+    source_keys = [state.key for state in source_stack]
+    prefix = _ordered_prefix(source_keys, [state.key for state in target_stack])
+
+    for position, state in enumerate(source_stack):
+        existing = target_by_key.get(state.key)
+        try:
+            if existing is not None and position >= prefix:
+                # Falsche Reihenfolge: entfernen und am Ende neu anhängen
+                view.RemoveFilter(state.filter_id)
+                counts['writes'] += 1
+                counts['reordered'] += 1
+                existing = None
+
+            if existing is None:
+                view.AddFilter(state.filter_id)
+                view.SetFilterOverrides(state.filter_id, state.overrides)
+                counts['writes'] += 2
+                if not state.visible:
+                    view.SetFilterVisibility(state.filter_id, False)
+                    counts['writes'] += 1
+                if state.enabled is False:
+                    view.SetIsFilterEnabled(state.filter_id, False)
+                    counts['writes'] += 1
+                if state.key not in target_by_key:
+                    counts['added'] += 1
+                continue
+
+            changed = False
+            if existing.signature != state.signature:
+                view.SetFilterOverrides(state.filter_id, state.overrides)
+                counts['writes'] += 1
+                changed = True
+            if existing.visible != state.visible:
+                view.SetFilterVisibility(state.filter_id, state.visible)
+                counts['writes'] += 1
+                changed = True
+            if state.enabled is not None and existing.enabled != state.enabled:
+                view.SetIsFilterEnabled(state.filter_id, state.enabled)
+                counts['writes'] += 1
+                changed = True
+
+            counts['updated' if changed else 'skipped'] += 1
+
+        except Exception as e:
+            errors.append((state, e))
+
+    if errors:
+        raise FilterSyncError(errors, counts)
+    return counts
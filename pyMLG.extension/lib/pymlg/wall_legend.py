@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""WallLegend-Engine: Wandtypen gruppieren und Schnitte pro Typ erzeugen
+
+Gruppierung in einem Durchlauf über die Wände, pro Typ nur ein
+Repräsentant und ein Zähler (keine Listen aller Wände). Typnamen werden in
+einem Durchlauf über die WallTypes gelesen. Ein Parameterfilter-Collector
+pro Typ (ELEM_TYPE_PARAM) wäre hier langsamer: jeder davon prüft wieder alle
+Wände, also Typen x Wände statt Wände.
+"""
+
+import io
+
+# Standard-Höhe (Fuß), wenn die Wand keine eigene Höhe hat
+DEFAULT_HEIGHT = 10.0
+SECTION_MARGIN = 1.0
+NAME_PREFIX = u"Seccion_"
+MAX_NAME_LENGTH = 40
+
+# Isolierung des Repräsentanten im Schnitt
+# - temporär isolieren und dauerhaft machen: zwei API-Aufrufe, ohne den Inhalt
+#   der Ansicht aufzuzählen
+# - bisheriges Verfahren: alle Elemente der Ansicht sammeln, alle anderen ausblenden
+ISOLATE_TEMPORARY = "temporary"
+ISOLATE_HIDE_OTHERS = "hide_others"
+ISOLATION_STRATEGY = ISOLATE_TEMPORARY
+
+NO_MATERIAL = u"Sin material"
+CSV_DELIMITER = u";"
+LAYER_COLUMNS = (u"Tipo", u"Capa", u"Funcion", u"Espesor (mm)", u"Material")
+
+
+class WallTypeGroup(object):
+    """Ein verwendeter Wandtyp mit Repräsentant und Anzahl Wände"""
+
+    __slots__ = ('type_id', 'type_name', 'representative', 'count')
+
+    def __init__(self, type_id, type_name, representative):
+        self.type_id = type_id
+        self.type_name = type_name
+        self.representative = representative
+        self.count = 0
+
+
+def group_walls_by_type(doc):
+    """
+    Ein Durchlauf über alle Wände (Repräsentant = erste Wand mit Wandlinie)
+    Returns: list[WallTypeGroup] in Reihenfolge des ersten Auftretens
+    """
+    from Autodesk.Revit.DB import BuiltInParameter, FilteredElementCollector, LocationCurve, Wall, WallType
+    from pymlg.params import ParameterCache
+
+    # Typnamen: ein Durchlauf über die WallTypes
+    name_bip = BuiltInParameter.SYMBOL_NAME_PARAM
+    params = ParameterCache(doc, [name_bip])
+    params.load_elements(FilteredElementCollector(doc).OfClass(WallType))
+
+    groups = {}
+    order = []
+    walls = FilteredElementCollector(doc).OfClass(Wall).WhereElementIsNotElementType()
+    for wall in walls:
+        type_id = wall.GetTypeId()
+        key = type_id.IntegerValue
+        group = groups.get(key)
+        if group is None:
+            type_name = params.get(type_id, name_bip) or u"Tipo_{}".format(key)
+            group = groups[key] = WallTypeGroup(type_id, type_name, None)
+            order.append(group)
+        if group.representative is None and isinstance(wall.Location, LocationCurve):
+            group.representative = wall
+        group.count += 1
+
+    return order
+
+
+def section_name(type_name):
+    """Basisname des Schnitts (ohne Sonderzeichen, gekürzt)"""
+    clean_name = type_name.replace('/', '-').replace('\\', '-').replace(':', '-')
+    clean_name = clean_name.replace(' ', '_')
+    return NAME_PREFIX + clean_name[:MAX_NAME_LENGTH]
+
+
+def section_box(wall, height=None):
+    """
+    Schnitt quer zur Wand durch die Wandmitte
+    Returns: BoundingBoxXYZ für ViewSection.CreateSection
+    """
+    from Autodesk.Revit.DB import BoundingBoxXYZ, Transform, XYZ
+
+    curve = wall.Location.Curve
+    p1 = curve.GetEndPoint(0)
+    p2 = curve.GetEndPoint(1)
+
+    # Punkt in der Mitte, Richtung der Wand im Grundriss
+    midpoint = XYZ((p1.X + p2.X) / 2.0, (p1.Y + p2.Y) / 2.0, (p1.Z + p2.Z) / 2.0)
+    dx = p2.X - p1.X
+    dy = p2.Y - p1.Y
+    wall_length = (dx * dx + dy * dy) ** 0.5
+    if wall_length > 0:
+        dir_x, dir_y = dx / wall_length, dy / wall_length
+    else:
+        dir_x, dir_y = 1.0, 0.0
+
+    height = height if height and height > 0 else DEFAULT_HEIGHT
+    width = wall.WallType.Width
+
+    transform = Transform.Identity
+    transform.Origin = midpoint
+    transform.BasisX = XYZ(-dir_y, dir_x, 0)
+    transform.BasisY = XYZ.BasisZ
+    transform.BasisZ = XYZ(dir_x, dir_y, 0)
+
+    cut_depth = width / 2.0 + 0.2
+    view_width = height + SECTION_MARGIN * 2
+
+    bbox = BoundingBoxXYZ()
+    bbox.Transform = transform
+    bbox.Min = XYZ(-cut_depth, -SECTION_MARGIN, -view_width / 2)
+    bbox.Max = XYZ(cut_depth, height + SECTION_MARGIN, view_width / 2)
+    return bbox
+
+
+def isolate_element(doc, view, element_id, strategy=ISOLATION_STRATEGY):
+    """Blendet in `view` alles außer `element_id` aus (innerhalb einer Transaction)"""
+    from Autodesk.Revit.DB import ElementId, FilteredElementCollector
+    from System.Collections.Generic import List
+
+    if strategy == ISOLATE_TEMPORARY:
+        view.IsolateElementsTemporary(List[ElementId]([element_id]))
+        view.ConvertTemporaryHideIsolateToPermanent()
+        return
+
+    all_ids = FilteredElementCollector(doc, view.Id).WhereElementIsNotElementType().ToElementIds()
+    to_hide = [elem_id for elem_id in all_ids if elem_id != element_id]
+    if to_hide:
+        view.HideElements(List[ElementId](to_hide))
+
+
+def isolate_in_sections(doc, sections, strategy=ISOLATION_STRATEGY):
+    """
+    Isoliert je Schnitt sein Element
+    sections: Liste (view, element_id)
+    Returns: Liste (view, exception) der fehlgeschlagenen Schnitte
+    """
+    failed = []
+    for view, element_id in sections:
+        try:
+            isolate_element(doc, view, element_id, strategy)
+        except Exception as e:
+            failed.append((view, e))
+    return failed
+
+
+class MaterialNames(object):
+    """Material-Id -> Name, gemeinsam für alle Wandtypen (jedes Material einmal gelesen)"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._names = {}
+        self.lookups = 0
+
+    def name(self, material_id):
+        key = material_id.IntegerValue
+        name = self._names.get(key)
+        if name is None:
+            material = self.doc.GetElement(material_id) if key > 0 else None
+            name = self._names[key] = material.Name if material else NO_MATERIAL
+            self.lookups += 1
+        return name
+
+
+class LayerRow(object):
+    __slots__ = ('type_name', 'index', 'function', 'width_mm', 'material')
+
+    def __init__(self, type_name, index, function, width_mm, material):
+        self.type_name = type_name
+        self.index = index
+        self.function = function
+        self.width_mm = width_mm
+        self.material = material
+
+    def values(self):
+        return (self.type_name, self.index, self.function, u"{:.1f}".format(self.width_mm), self.material)
+
+
+def layer_table(wall_type, type_name, materials):
+    """
+    Schichten eines Wandtyps (außen -> innen)
+    materials: MaterialNames (geteilt über alle Typen)
+    Returns: list[LayerRow] (leer ohne CompoundStructure, z.B. Vorhangfassade)
+    """
+    structure = wall_type.GetCompoundStructure()
+    if not structure:
+        return []
+
+    rows = []
+    for index, layer in enumerate(structure.GetLayers(), 1):
+        rows.append(LayerRow(type_name, index, str(layer.Function), layer.Width * 304.8,
+                             materials.name(layer.MaterialId)))
+    return rows
+
+
+def _csv_field(value):
+    text = value if isinstance(value, type(u"")) else u"{}".format(value)
+    if CSV_DELIMITER in text or u'"' in text or u"\n" in text:
+        text = u'"{}"'.format(text.replace(u'"', u'""'))
+    return text
+
+
+def write_layer_csv(path, rows):
+    """Schreibt die Schichttabelle als CSV (Trennzeichen ';', UTF-8 mit BOM für Excel)"""
+    with io.open(path, 'w', encoding='utf-8-sig') as f:
+        for values in [LAYER_COLUMNS] + [row.values() for row in rows]:
+            f.write(CSV_DELIMITER.join(_csv_field(value) for value in values) + u"\n")
+    return len(rows)
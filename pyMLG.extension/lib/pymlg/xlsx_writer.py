@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Excel-freier XLSX-Writer
+
+Schreibt Zeilen direkt als OpenXML in temporäre Dateien (eine pro Blatt)
+und packt sie beim Schließen in das .xlsx-Zip. Der Speicherbedarf bleibt
+unabhängig von der Zeilenanzahl konstant.
+"""
+
+import io
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+INVALID_XML_CHARS = re.compile(u"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+MAX_SHEET_NAME = 31
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECL = u'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+try:
+    _INT_TYPES = (int, long)
+except NameError:
+    _INT_TYPES = (int,)
+
+
+def unique_sheet_name(name, used_names):
+    """
+    Macht einen Blattnamen Excel-konform (max. 31 Zeichen, keine []:*?/\\)
+    und eindeutig gegenüber `used_names` (wird ergänzt)
+    """
+    base = INVALID_SHEET_CHARS.sub("_", name or "").strip("'") or "Sheet"
+    base = base[:MAX_SHEET_NAME]
+
+    candidate = base
+    counter = 2
+    while candidate.lower() in used_names:
+        suffix = " ({})".format(counter)
+        candidate = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        counter += 1
+
+    used_names.add(candidate.lower())
+    return candidate
+
+
+def column_letter(col):
+    """Wandelt eine 1-basierte Spaltennummer in Excel-Buchstaben um (1 -> A, 28 -> AB)"""
+    letters = ""
+    while col > 0:
+        col, rest = divmod(col - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def _escape(text):
+    text = INVALID_XML_CHARS.sub(u"", text)
+    return text.replace(u"&", u"&amp;").replace(u"<", u"&lt;").replace(u">", u"&gt;")
+
+
+def _cell_xml(ref, value):
+    if value is None or value == "":
+        return u""
+    if isinstance(value, bool):
+        return u'<c r="{}" t="b"><v>{}</v></c>'.format(ref, int(value))
+    if isinstance(value, float):
+        return u'<c r="{}"><v>{!r}</v></c>'.format(ref, value)
+    if isinstance(value, _INT_TYPES):
+        return u'<c r="{}"><v>{:d}</v></c>'.format(ref, value)
+    return u'<c r="{}" t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(
+        ref, _escape(u"{}".format(value)))
+
+
+class SheetStream(object):
+    """Ein Arbeitsblatt, das Zeile für Zeile in eine temporäre Datei geschrieben wird"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.row_count = 0
+        self._file = io.open(path, "w", encoding="utf-8")
+        self._file.write(_XML_DECL)
+        self._file.write(u'<worksheet xmlns="{}"><sheetData>'.format(_NS_MAIN))
+
+    def write_row(self, values):
+        """Hängt eine Zeile an (str -> Text, int/float -> Zahl, None/"" -> leer)"""
+        self.row_count += 1
+        row = self.row_count
+        cells = u"".join(
+            _cell_xml(u"{}{}".format(column_letter(col), row), value)
+            for col, value in enumerate(values, 1)
+        )
+        self._file.write(u'<row r="{}">{}</row>'.format(row, cells))
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.write(u"</sheetData></worksheet>")
+        self._file.close()
+        self._file = None
+
+
+class XlsxWriter(object):
+    """
+    Minimaler Streaming-Writer für .xlsx-Dateien
+    Verwendung:
+        with XlsxWriter(pfad) as book:
+            sheet = book.add_sheet("Türliste")
+            sheet.write_row(["Nr", "Breite"])
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._sheets = []
+        self._used_names = set()
+        self._temp_dir = tempfile.mkdtemp(prefix="pymlg_xlsx_")
+
+    def add_sheet(self, name):
+        sheet_name = unique_sheet_name(name, self._used_names)
+        temp_path = os.path.join(self._temp_dir, "sheet{}.xml".format(len(self._sheets) + 1))
+        sheet = SheetStream(sheet_name, temp_path)
+        self._sheets.append(sheet)
+        return sheet
+
+    def close(self):
+        """Schließt alle Blätter und schreibt das Zip-Paket"""
+        try:
+            for sheet in self._sheets:
+                sheet.close()
+            self._write_package()
+        finally:
+            self._cleanup()
+
+    def discard(self):
+        """Verwirft alle Daten ohne Datei zu schreiben"""
+        for sheet in self._sheets:
+            sheet.close()
+        self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+    def _cleanup(self):
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def _write_package(self):
+        if not self._sheets:
+            self.add_sheet("Sheet1").close()
+        sheets = self._sheets
+
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as package:
+            package.writestr("[Content_Types].xml", self._content_types_xml(sheets).encode("utf-8"))
+            package.writestr("_rels/.rels", self._root_rels_xml().encode("utf-8"))
+            package.writestr("xl/workbook.xml", self._workbook_xml(sheets).encode("utf-8"))
+            package.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels_xml(sheets).encode("utf-8"))
+            package.writestr("xl/styles.xml", self._styles_xml().encode("utf-8"))
+            for index, sheet in enumerate(sheets, 1):
+                package.write(sheet.path, "xl/worksheets/sheet{}.xml".format(index))
+
+    @staticmethod
+    def _content_types_xml(sheets):
+        overrides = u"".join(
+            u'<Override PartName="/xl/worksheets/sheet{}.xml" ContentType="application/'
+            u'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'.format(index)
+            for index in range(1, len(sheets) + 1)
+        )
+        return (
+            _XML_DECL +
+            u'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            u'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            u'<Default Extension="xml" ContentType="application/xml"/>'
+            u'<Override PartName="/xl/workbook.xml" ContentType="application/'
+            u'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            u'<Override PartName="/xl/styles.xml" ContentType="application/'
+            u'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + overrides +
+            u'</Types>'
+        )
+
+    @staticmethod
+    def _root_rels_xml():
+        return (
+            _XML_DECL +
+            u'<Relationships xmlns="{}">'.format(_NS_PKG_REL) +
+            u'<Relationship Id="rId1" Type="{}/officeDocument" Target="xl/workbook.xml"/>'.format(_NS_REL) +
+            u'</Relationships>'
+        )
+
+    @staticmethod
+    def _workbook_xml(sheets):
+        entries = u"".join(
+            u'<sheet name="{}" sheetId="{}" r:id="rId{}"/>'.format(_escape(sheet.name).replace(u'"', u"&quot;"),
+                                                                  index, index)
+            for index, sheet in enumerate(sheets, 1)
+        )
+        return (
+            _XML_DECL +
+            u'<workbook xmlns="{}" xmlns:r="{}"><sheets>{}</sheets></workbook>'.format(_NS_MAIN, _NS_REL, entries)
+        )
+
+    @staticmethod
+    def _workbook_rels_xml(sheets):
+        entries = u"".join(
+            u'<Relationship Id="rId{0}" Type="{1}/worksheet" Target="worksheets/sheet{0}.xml"/>'.format(index, _NS_REL)
+            for index in range(1, len(sheets) + 1)
+        )
+        styles = u'<Relationship Id="rId{}" Type="{}/styles" Target="styles.xml"/>'.format(len(sheets) + 1, _NS_REL)
+        return _XML_DECL + u'<Relationships xmlns="{}">{}{}</Relationships>'.format(_NS_PKG_REL, entries, styles)
+
+    @staticmethod
+    def _styles_xml():
+        return (
+            _XML_DECL +
+            u'<styleSheet xmlns="{}">'.format(_NS_MAIN) +
+            u'<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            u'<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            u'<fill><patternFill patternType="gray125"/></fill></fills>'
+            u'<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            u'<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            u'<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+            u'</styleSheet>'
+        )
@@ -1,10 +1,24 @@
 # -*- coding: utf-8 -*-
+__doc__ = "Dupliziert die ausgewählten Sheets (leer, mit Plankopf)\n" \
+          "Shift-Klick: Sheets mit platzierten Views, Schedules und Annotationen duplizieren"
+
 import clr
 
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
+from pyrevit import EXEC_PARAMS
+
+from pymlg import catalog, sheet_copy
+from pymlg.batch import BatchExecutor
+from pymlg.log import get_logger
+from pymlg.name_index import sheet_number_index, view_name_index
+
+log = get_logger("DuplicatePlan")
+
+# Shift-Klick: Batch-Modus mit Sheet-Inhalt
+copy_contents = EXEC_PARAMS.config_mode
 
 # Aktuelles Dokument
 uidoc = __revit__.ActiveUIDocument
@@ -35,99 +49,96 @@ try:
 
         sys.exit()
 
-    # Transaction starten (mit Fehlerbehandlung)
-    t = Transaction(doc, "Sheets kopieren")
-    t.Start()
+    # Titleblock-Typen holen (Katalog-Cache)
+    titleblock_types = catalog.titleblock_types(doc)
 
-    try:
-        # Titleblock-Typen holen
-        titleblock_types = FilteredElementCollector(doc) \
-            .OfCategory(BuiltInCategory.OST_TitleBlocks) \
-            .WhereElementIsElementType() \
-            .ToElements()
+    if len(titleblock_types) == 0:
+        # Keine Titleblocks im Projekt
+        TaskDialog.Show("Fehler", "Keine Titleblock-Typen im Projekt gefunden!")
+        import sys
 
-        if len(titleblock_types) == 0:
-            # Keine Titleblocks im Projekt
-            t.RollBack()
-            TaskDialog.Show("Fehler", "Keine Titleblock-Typen im Projekt gefunden!")
-            import sys
+        sys.exit()
 
-            sys.exit()
+    default_tb = titleblock_types[0].Id
 
-        default_tb = titleblock_types[0].Id
+    # Alle existierenden Sheet-Nummern (Hash-Index mit Zähler pro Basisnummer)
+    sheet_numbers = sheet_number_index(doc)
 
-        # Alle existierenden Sheet-Nummern (cached für Performance)
-        all_numbers = set()
-        try:
-            all_sheets = FilteredElementCollector(doc).OfClass(ViewSheet).ToElements()
-            all_numbers = set([s.SheetNumber for s in all_sheets])
-        except:
-            # Fallback: Leere Liste
-            all_numbers = set()
+    # Plankopf-Typ je Sheet: ein Collector für alle Sheets
+    index_label = "Plankopf-Index (1 Collector)"
+    with log.timer(index_label):
+        sheet_titleblocks = sheet_copy.titleblock_type_index(doc)
 
-        # Zähler für Erfolg/Fehler
-        success_count = 0
-        failed_count = 0
+    log.report("Plankopf-Index: 1 Collector statt %s (%.3f s)",
+               len(selected_sheets), log.timings[index_label])
 
-        for sheet in selected_sheets:
-            try:
-                # Titleblock vom Original holen
-                tbs = FilteredElementCollector(doc, sheet.Id) \
+    # Debug-Modus: Vergleich mit der früheren Abfrage pro Sheet. Beide Varianten
+    # laufen nach dem ersten Index-Aufbau, also mit gleich warmem Cache.
+    if log.debug_enabled:
+        per_sheet_label = "Plankopf je Sheet ({} Collectoren, Vergleich)".format(len(selected_sheets))
+        with log.timer(per_sheet_label):
+            for sheet in selected_sheets:
+                FilteredElementCollector(doc, sheet.Id) \
                     .OfCategory(BuiltInCategory.OST_TitleBlocks) \
                     .WhereElementIsNotElementType() \
                     .ToElements()
 
-                tb_type = tbs[0].GetTypeId() if len(tbs) > 0 else default_tb
-
-                # Neues Sheet erstellen
-                new_sheet = ViewSheet.Create(doc, tb_type)
-
-                # Nummer generieren (mit Limit gegen Endlosschleife)
-                base_num = sheet.SheetNumber
-                counter = 1
-                max_attempts = 1000  # Sicherheit gegen Endlosschleife
-                new_num = "{} - Kopie {}".format(base_num, counter)
-
-                while new_num in all_numbers and counter < max_attempts:
-                    counter += 1
-                    new_num = "{} - Kopie {}".format(base_num, counter)
-
-                # Wenn 1000 Kopien erreicht -> Eindeutige ID anhängen
-                if counter >= max_attempts:
-                    import random
-
-                    new_num = "{}-K{}".format(base_num, random.randint(1000, 9999))
-
-                # Sheet-Nummer und Name setzen
-                new_sheet.SheetNumber = new_num
-                new_sheet.Name = "{} - Kopie {}".format(sheet.Name, counter)
-                all_numbers.add(new_num)
-
-                success_count += 1
-
-            except Exception as ex:
-                # Einzelnes Sheet fehlgeschlagen -> weiter mit nächstem
-                failed_count += 1
-                # Bei kritischem Fehler: Sheet wieder löschen falls erstellt
-                try:
-                    if 'new_sheet' in locals() and new_sheet:
-                        doc.Delete(new_sheet.Id)
-                except:
-                    pass
-
-        # Transaction abschließen
-        if success_count > 0:
-            t.Commit()
-            # Optional: Stille Erfolgsmeldung (auskommentiert für "still mode")
-            # TaskDialog.Show("Erfolg", "{} Sheet(s) kopiert".format(success_count))
-        else:
+        warm_index_label = "Plankopf-Index (1 Collector, Vergleich)"
+        with log.timer(warm_index_label):
+            sheet_copy.titleblock_type_index(doc)
+
+        log.report("Plankopf-Suche (Vergleich): %s Collectoren %.3f s, Index %.3f s",
+                   len(selected_sheets), log.timings[per_sheet_label], log.timings[warm_index_label])
+
+    # Batch-Modus: Inhalt aller Sheets in einem Durchlauf sammeln
+    if copy_contents:
+        sheet_contents = sheet_copy.collect_sheet_contents(doc, selected_sheets)
+        view_names = view_name_index(doc)
+
+    def duplicate_sheet(sheet):
+        """Erstellt die Kopie eines Sheets (Fehler rollen nur dieses Sheet zurück)"""
+        # Titleblock vom Original holen
+        tb_type = sheet_titleblocks.get(sheet.Id.IntegerValue, default_tb)
+
+        # Neues Sheet erstellen
+        new_sheet = ViewSheet.Create(doc, tb_type)
+
+        # Nummer generieren
+        new_num, counter = sheet_numbers.allocate(sheet.SheetNumber)
+
+        # Sheet-Nummer und Name setzen
+        new_sheet.SheetNumber = new_num
+        new_sheet.Name = "{} - Kopie {}".format(sheet.Name, counter)
+
+        # Views, Schedules und Annotationen übertragen
+        if copy_contents:
+            contents = sheet_contents[sheet.Id.IntegerValue]
+            result = sheet_copy.copy_sheet_contents(doc, sheet, new_sheet, contents, view_names)
+            log.debug("Sheet %s: %s Views, %s Schedules, %s Annotationen",
+                      new_num, result.views, result.schedules, result.annotations)
+            for error in result.errors:
+                log.warning("Sheet %s: %s", new_num, error)
+
+        return new_sheet
+
+    try:
+        # Chunk-Transactions in einer TransactionGroup, ein Undo-Eintrag
+        result = BatchExecutor(doc, "Sheets kopieren").run(selected_sheets, duplicate_sheet)
+
+        for sheet, ex in result.failed:
+            # Einzelnes Sheet fehlgeschlagen -> wurde zurückgerollt
+            log.warning("Sheet %s: %s", sheet.SheetNumber, ex)
+
+        # Durchsatz (Sheets/s) immer in der Zusammenfassung
+        log.report("Sheets kopieren: %s", result.summary())
+        log.summary()
+
+        if not result.succeeded:
             # Nichts erfolgreich -> Rollback
-            t.RollBack()
             TaskDialog.Show("Fehler", "Keine Sheets konnten kopiert werden.")
 
     except Exception as e:
-        # Transaction fehlgeschlagen -> Rollback
-        t.RollBack()
+        # Batch fehlgeschlagen (fertige Chunks bleiben erhalten)
         TaskDialog.Show("Fehler", "Fehler beim Kopieren:\n{}".format(str(e)))
 
 except Exception as e:
@@ -7,6 +7,12 @@ from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
 from Autodesk.Revit.UI.Selection import *
 
+from pymlg.batch import BatchExecutor
+from pymlg.log import get_logger
+from pymlg.name_index import view_name_index
+
+log = get_logger("DuplicateView")
+
 # Aktuelles Dokument
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
@@ -42,42 +48,30 @@ if result == TaskDialogResult.Ok:
                 "Hinweis: Schedules, Sheets und Legends können nicht kopiert werden."
             )
         else:
-            # Transaction starten
-            t = Transaction(doc, "Views kopieren")
-            t.Start()
-
             try:
-                created_views = []
-                failed_views = []
+                # Alle existierenden View-Namen sammeln (Hash-Index)
+                view_names = view_name_index(doc)
 
-                # Alle existierenden View-Namen sammeln
-                all_view_names = [v.Name for v in FilteredElementCollector(doc).OfClass(View).ToElements()]
+                def duplicate_view(view):
+                    # View duplizieren
+                    new_view_id = view.Duplicate(ViewDuplicateOption.Duplicate)
+                    new_view = doc.GetElement(new_view_id)
 
-                for view in selected_views:
-                    try:
-                        # View duplizieren
-                        new_view_id = view.Duplicate(ViewDuplicateOption.Duplicate)
-                        new_view = doc.GetElement(new_view_id)
+                    # Namen generieren mit automatischer Nummerierung
+                    new_name = view_names.next_free(view.Name)
 
-                        # Namen generieren mit automatischer Nummerierung
-                        base_name = view.Name
-                        counter = 1
-                        new_name = "{} - Kopie {}".format(base_name, counter)
+                    # Namen setzen
+                    new_view.Name = new_name
+                    return new_name
 
-                        while new_name in all_view_names:
-                            counter += 1
-                            new_name = "{} - Kopie {}".format(base_name, counter)
+                # Chunk-Transactions, fehlerhafte Views werden einzeln zurückgerollt
+                batch_result = BatchExecutor(doc, "Views kopieren").run(selected_views, duplicate_view)
 
-                        # Namen setzen
-                        new_view.Name = new_name
-                        created_views.append(new_name)
-                        all_view_names.append(new_name)
-
-                    except Exception as ex:
-                        failed_views.append(view.Name)
-
-                # Transaction abschließen
-                t.Commit()
+                created_views = batch_result.succeeded
+                failed_views = []
+                for view, ex in batch_result.failed:
+                    failed_views.append(view.Name)
+                    log.warning("%s: %s", view.Name, ex)
 
                 # Erfolgsmeldung
                 message = ""
@@ -92,8 +86,10 @@ if result == TaskDialogResult.Ok:
                     for name in failed_views:
                         message += "  • {}\n".format(name)
 
+                message += "\n{:.1f} Views/s".format(batch_result.items_per_second)
+
                 TaskDialog.Show("Ergebnis", message)
+                log.summary()
 
             except Exception as e:
-                t.RollBack()
                 TaskDialog.Show("Fehler", "Fehler beim Kopieren:\n{}".format(str(e)))
\ No newline at end of file
@@ -1,15 +1,18 @@
 # -*- coding: utf-8 -*-
-__doc__ = "ExcelExport Exportiert ausgewählte Listen nach Excel"
+__doc__ = "ExcelExport Exportiert ausgewählte Listen nach Excel\n" \
+          "Shift-Klick: Export über Microsoft Excel (Interop)"
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
-from pyrevit import revit, forms
+from pyrevit import revit, forms, EXEC_PARAMS
 import sys
-import subprocess
-import clr
 
-clr.AddReference("Microsoft.Office.Interop.Excel")
-from Microsoft.Office.Interop import Excel
+from pymlg import excel_export, pipeline
+from pymlg.log import get_logger
+from pymlg.schedule_rows import build_row_index
+from pymlg.schedule_snapshot import ScheduleSnapshot
+
+log = get_logger("ExcelExport")
 
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
@@ -47,61 +50,84 @@ datei_pfad = forms.save_file(
     default_name="Schedule Export"
 )
 
-if selected_names and datei_pfad:
-    print("User selected:" + datei_pfad)
 
-    # Excel starten
-    excel_app = Excel.ApplicationClass()
-    excel_app.Visible = False
-    workbook = excel_app.Workbooks.Add()
 
-    #Datenschlefe um Excel zu füllen:
-    for name in selected_names:
-        schedule_obj = schedule_dict[name]
-        tableData = schedule_obj.GetTableData()
-        body_Headers = tableData.GetSectionData(SectionType.Body)
+def type_name_of(element):
+    elem_type_id = element.GetTypeId()
+
+    if elem_type_id != ElementId.InvalidElementId:
+        elem_type_obj = doc.GetElement(elem_type_id)
+        if elem_type_obj:
+            return Element.Name.GetValue(elem_type_obj)
+        return "Kein Typ (None)"
+    return "Invalid ID"
+
+
+def extract_schedule(name):
+    """Revit-Thread: liest Schedule-Texte und Element-Ids als reine Python-Daten"""
+    schedule_obj = schedule_dict[name]
+    header_data, body_data = excel_export.get_schedule_sections(schedule_obj)
 
-        # Worksheet erstellen
-        worksheet = workbook.Worksheets.Add()
-        worksheet.Name = name
+    # Id/Typ je Body-Zeile (exakt über den Zeilenindex)
+    row_index = build_row_index(doc, schedule_obj)
 
-        #Ids holen von Elementen aus Liste:
+    if row_index is not None:
+        ids_by_row = {}
+        for row, element in row_index.elements(doc).items():
+            ids_by_row[row] = [element.Id.IntegerValue, type_name_of(element)]
+    else:
+        # Fallback: Elemente der Reihe nach ab Body-Zeile 3
+        log.warning("%s: kein exakter Zeilenindex möglich, Ids der Reihe nach", name)
         collector = FilteredElementCollector(doc, schedule_obj.Id)
-        element_List = collector.ToElements()
+        ids_by_row = {}
+        for i, element in enumerate(collector.ToElements()):
+            ids_by_row[i + 2] = [element.Id.IntegerValue, type_name_of(element)]
 
+    return {
+        'worksheet': workbook.add_sheet(name),
+        'header': excel_export.read_section(header_data),
+        'body': ScheduleSnapshot.from_section(body_data),
+        'ids': ids_by_row,
+    }
 
-        zeile = 3
-        for element in element_List:
-            elem_id = element.Id.IntegerValue
-            elem_type_id = element.GetTypeId()
 
-            if elem_type_id != ElementId.InvalidElementId:
-                elem_type_obj = doc.GetElement(elem_type_id)
-                if elem_type_obj:
-                    elem_type_name = Element.Name.GetValue(elem_type_obj)
-                else:
-                    elem_type_name = "Kein Typ (None)"
-            else:
-                elem_type_name = "Invalid ID"
+def write_schedule(name, data):
+    """Worker-Thread: formatiert die Zeilen, konvertiert Zahlen und schreibt das Blatt"""
+    worksheet = data['worksheet']
+    ids_by_row = data['ids']
+    leer = ["", ""]
 
-            worksheet.Cells[zeile, 1] = elem_id
-            worksheet.Cells[zeile, 2] = elem_type_name
+    # Spalte 1-2 = Id/Typ der Element-Zeile, ab Spalte 3 = Schedule
+    for zellen in data['header']:
+        worksheet.write_row(leer + zellen)
 
-            zeile = zeile + 1
+    body = data['body']
+    for row, zellen in enumerate(body.iter_rows()):
+        worksheet.write_row(ids_by_row.get(row, leer) + excel_export.convert_row(zellen))
+
+    # Überzählige Elemente (nur im Fallback möglich)
+    for row in range(body.n_rows, max(ids_by_row or [-1]) + 1):
+        worksheet.write_row(ids_by_row.get(row, leer))
+
+
+if selected_names and datei_pfad:
+    print("User selected:" + datei_pfad)
 
-        anzahl_Spalten = body_Headers.NumberOfColumns
-        anzahl_Reihen = body_Headers.NumberOfRows
+    # Shift-Klick: Export über Excel (Interop) statt über den internen XLSX-Writer
+    # Interop (COM) nur im Revit-Thread -> dann ohne Worker-Pipeline
+    if EXEC_PARAMS.config_mode:
+        backend = excel_export.BACKEND_INTEROP
+        workers = 0
+    else:
+        backend = excel_export.BACKEND_XLSX
+        workers = pipeline.DEFAULT_WORKERS
 
-        # Daten schreiben
-        for reihe in range(anzahl_Reihen):
-            for spalte in range(anzahl_Spalten):
-                zellenText = body_Headers.GetCellText(reihe, spalte)
-                worksheet.Cells[reihe + 1, spalte + 3] = zellenText
+    with excel_export.open_workbook(datei_pfad, backend) as workbook:
+        #Datenschlefe um Excel zu füllen:
+        stats = pipeline.run_pipeline(selected_names, extract_schedule, write_schedule, workers=workers)
 
-    # Speichern
-    workbook.SaveAs(datei_pfad)
-    workbook.Close()
-    excel_app.Quit()
     print("Excel wurde erstellt!")
+    print("Pipeline ({} Worker): {}".format(workers, stats.summary()))
+    log.summary()
 else:
-    print("User didn't selected anything")
\ No newline at end of file
+    print("User didn't selected anything")
@@ -1,57 +1,79 @@
 # -*- coding: utf-8 -*-
 __title__ = "PassFilter\nOverrides"
-__doc__ = "Überträgt grafische Filterüberschreibungen von einer Ansichtsvorlage zu einer anderen"
+__doc__ = "Überträgt Filter (Reihenfolge, Sichtbarkeit, aktiviert, Überschreibungen) " \
+          "von einer Ansichtsvorlage zu anderen\n" \
+          "Shift-Klick: Synchronisation vieler Vorlagen nach einem JSON-Manifest\n" \
+          '{"mappings": [{"source": "ARC_Master", "targets": ["ARC_*"], "exclude": []}]}'
 __author__ = "Manuel"
 
-from pyrevit import revit, DB, forms, script
-from Autodesk.Revit.DB import Transaction, FilteredElementCollector
+from pyrevit import revit, DB, forms, script, EXEC_PARAMS
+from Autodesk.Revit.DB import SubTransaction, Transaction
 from collections import defaultdict
+import fnmatch
+import json
+import time
+
+from pymlg import catalog
+from pymlg.batch import BatchExecutor
+from pymlg.log import get_logger
+from pymlg.view_filters import FilterSyncError, read_filter_stack, sync_filter_stack
 
 doc = revit.doc
+log = get_logger("PassFilterOverrides")
 
 
 def get_all_view_templates():
-    """Sammelt alle Ansichtsvorlagen im Projekt"""
-    collector = FilteredElementCollector(doc).OfClass(DB.View)
-    return [v for v in collector if v.IsTemplate]
+    """Alle Ansichtsvorlagen im Projekt (aus dem Katalog-Cache)"""
+    return catalog.templates(doc)
 
 
 def get_filter_data(template):
     """
-    Sammelt alle Filter-Daten einer Vorlage
-    Returns: dict {filter_id: (filter_name, override_settings)}
+    Sammelt alle Filter-Daten einer Vorlage (Reihenfolge, Sichtbarkeit, aktiviert, Overrides)
+    Returns: list[FilterState]
     """
-    filter_data = {}
-
     try:
-        filter_ids = template.GetFilters()
+        return read_filter_stack(doc, template)
+    except Exception as e:
+        log.error("Fehler beim Auslesen der Filter: %s", e)
+        return []
 
-        for filter_id in filter_ids:
-            filter_elem = doc.GetElement(filter_id)
-            if filter_elem:
-                overrides = template.GetFilterOverrides(filter_id)
-                filter_data[filter_id] = (filter_elem.Name, overrides)
 
-    except Exception as e:
-        print("Fehler beim Auslesen der Filter: {}".format(e))
+def sync_target(source_stack, target_template, target_stack, stats):
+    """
+    Überträgt den Filter-Stapel einer Quelle auf eine Ziel-Vorlage (in offener Transaction)
+    Statistik zählt nur vollständig übertragene Vorlagen; sonst FilterSyncError.
+    """
+    start = time.time()
+    counts = sync_filter_stack(target_template, source_stack, target_stack)
+    elapsed = time.time() - start
+
+    stats['write_seconds'] += elapsed
+    for key, value in counts.items():
+        stats[key] += value
+    stats['total'] += len(source_stack)
+
 
-    return filter_data
+def estimate_saved_time(stats):
+    """Zeitersparnis: übersprungene Filter x mittlere Dauer pro geändertem Filter (inkl. Commit)"""
+    changed = stats['updated'] + stats['added'] + stats['reordered']
+    if changed and stats['skipped']:
+        stats['saved_seconds'] = stats['skipped'] * stats['write_seconds'] / changed
 
 
 def copy_filter_overrides_optimized(source_template, target_templates):
     """Optimierte Version - sammelt erst alle Daten, dann eine Transaction"""
 
     # PHASE 1: Daten sammeln (außerhalb Transaction)
-    source_filters = get_filter_data(source_template)
+    source = get_filter_data(source_template)
 
-    if not source_filters:
+    if not source:
         forms.alert("No filter in this View", exitscript=True)
 
-    # Ziel-Daten sammeln (welche Filter existieren bereits?)
+    # Ziel-Daten sammeln (welche Filter existieren bereits, mit welchen Overrides?)
     target_data = {}
     for target in target_templates:
-        existing_filters = set(target.GetFilters())
-        target_data[target.Id] = existing_filters
+        target_data[target.Id] = get_filter_data(target)
 
     # Statistik
     stats = defaultdict(int)
@@ -63,39 +85,135 @@ def copy_filter_overrides_optimized(source_template, target_templates):
 
         try:
             for target_template in target_templates:
-                existing_filters = target_data[target_template.Id]
-
-                for filter_id, (filter_name, overrides) in source_filters.items():
-                    try:
-                        if filter_id in existing_filters:
-                            # Filter existiert - nur Overrides updaten
-                            target_template.SetFilterOverrides(filter_id, overrides)
-                            stats['updated'] += 1
-                        else:
-                            # Filter hinzufügen + Overrides setzen
-                            target_template.AddFilter(filter_id)
-                            target_template.SetFilterOverrides(filter_id, overrides)
-                            stats['added'] += 1
-
-                        stats['total'] += 1
-
-                    except Exception as e:
-                        error_msg = "Filter '{}' → {}: {}".format(
-                            filter_name,
-                            target_template.Name,
-                            str(e)
-                        )
-                        errors.append(error_msg)
-
+                # Eigene SubTransaction: eine fehlerhafte Vorlage wird komplett zurückgerollt
+                sub = SubTransaction(doc)
+                sub.Start()
+                try:
+                    sync_target(source, target_template, target_data[target_template.Id], stats)
+                    sub.Commit()
+                except FilterSyncError as e:
+                    sub.RollBack()
+                    errors.append(u"{}: {}".format(target_template.Name, e))
+
+            commit_start = time.time()
             t.Commit()
+            stats['write_seconds'] += time.time() - commit_start
 
         except Exception as e:
             t.RollBack()
             forms.alert("Critical error: {}".format(str(e)), exitscript=True)
 
+    estimate_saved_time(stats)
     return stats, errors
 
 
+def _is_text(value):
+    return isinstance(value, (type(u""), str))
+
+
+def _text_list(entry, key, label):
+    values = entry.get(key, [])
+    if _is_text(values):
+        values = [values]
+    if not isinstance(values, list) or not all(_is_text(value) for value in values):
+        raise ValueError(u"{}: '{}' muss eine Liste von Namen/Mustern sein".format(label, key))
+    return values
+
+
+def load_manifest(path):
+    """
+    Liest und prüft das Manifest (Quelle -> Muster der Ziel-Vorlagen)
+    Returns: list [(source_name, target_patterns, exclude_patterns)]
+    Raises: ValueError mit dem fehlerhaften Eintrag
+    """
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except ValueError as e:
+        raise ValueError(u"Kein gültiges JSON: {}".format(e))
+
+    entries = manifest.get("mappings") if isinstance(manifest, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError(u'Es fehlt die Liste "mappings"')
+
+    mappings = []
+    for number, entry in enumerate(entries, 1):
+        label = u"Eintrag {}".format(number)
+        if not isinstance(entry, dict):
+            raise ValueError(u"{}: kein Objekt ({})".format(label, entry))
+        source = entry.get("source")
+        if not source or not _is_text(source):
+            raise ValueError(u'{}: "source" fehlt oder ist kein Name'.format(label))
+        label = u"{} ('{}')".format(label, source)
+        targets = _text_list(entry, "targets", label)
+        if not targets:
+            raise ValueError(u'{}: "targets" ist leer'.format(label))
+        mappings.append((source, targets, _text_list(entry, "exclude", label)))
+    return mappings
+
+
+def resolve_manifest(mappings, template_dict):
+    """
+    Löst die Muster gegen die Vorlagen-Namen auf (fnmatch, z.B. "ARC_*")
+    Returns: list [(source_template, [target_templates])]
+    """
+    names = sorted(template_dict.keys())
+    resolved = []
+    for source_name, target_patterns, exclude_patterns in mappings:
+        source_template = template_dict.get(source_name)
+        if source_template is None:
+            log.error("Manifest: Quell-Vorlage '%s' nicht gefunden", source_name)
+            continue
+
+        targets = [template_dict[name] for name in names
+                   if name != source_name
+                   and any(fnmatch.fnmatch(name, pattern) for pattern in target_patterns)
+                   and not any(fnmatch.fnmatch(name, pattern) for pattern in exclude_patterns)]
+        if not targets:
+            log.warning("Manifest: keine Ziel-Vorlage für '%s'", source_name)
+            continue
+        resolved.append((source_template, targets))
+    return resolved
+
+
+def sync_manifest(resolved):
+    """
+    Alle Zuordnungen in einer TransactionGroup (Chunks, ein Undo-Eintrag)
+    Jede Quelle wird einmal gelesen, auch wenn sie in mehreren Einträgen vorkommt;
+    ist eine Quelle zugleich Ziel, wird ihr Stapel nach dem Schreiben neu gelesen.
+    Eine Vorlage mit fehlerhaftem Filter wird komplett zurückgerollt und zählt als Fehler.
+    Returns: (stats, errors, batch_result)
+    """
+    stats = defaultdict(int)
+    errors = []
+
+    sources = {}
+    pairs = []
+    for source_template, targets in resolved:
+        key = source_template.Id.IntegerValue
+        if key not in sources:
+            sources[key] = get_filter_data(source_template)
+            if not sources[key]:
+                log.warning("Manifest: '%s' hat keine Filter", source_template.Name)
+        pairs.extend((key, target) for target in targets)
+
+    def sync_pair(pair):
+        key, target = pair
+        # FilterSyncError -> BatchExecutor rollt die SubTransaction dieser Vorlage zurück
+        sync_target(sources[key], target, get_filter_data(target), stats)
+        target_key = target.Id.IntegerValue
+        if target_key in sources:
+            sources[target_key] = get_filter_data(target)
+        return target
+
+    result = BatchExecutor(doc, "Filter-Standard synchronisieren").run(pairs, sync_pair)
+    for (key, target), ex in result.failed:
+        errors.append("{}: {}".format(target.Name, ex))
+
+    estimate_saved_time(stats)
+    return stats, errors, result
+
+
 def show_results_compact(stats, errors, source_name, target_count):
     """Kompakte Ergebnis-Anzeige"""
     output = script.get_output()
@@ -107,6 +225,11 @@ def show_results_compact(stats, errors, source_name, target_count):
     output.print_md("**Total:** {} Filter-Operationen".format(stats['total']))
     output.print_md("- Added: {}".format(stats['added']))
     output.print_md("- Updated: {}".format(stats['updated']))
+    output.print_md("- Reordered: {}".format(stats['reordered']))
+    output.print_md("- Skipped (unchanged): {}".format(stats['skipped']))
+    output.print_md("- API writes: {}".format(stats['writes']))
+    if stats['saved_seconds']:
+        output.print_md("- Time saved: ~{:.1f} s".format(stats['saved_seconds']))
 
     if errors:
         output.print_md("")
@@ -127,6 +250,28 @@ template_dict = {
     t.Name: t for t in all_templates
 }
 
+# Shift-Klick: Manifest-Modus ohne weitere Dialoge
+if EXEC_PARAMS.config_mode:
+    manifest_path = forms.pick_file(file_ext='json', title="Filter-Manifest")
+    if not manifest_path:
+        script.exit()
+
+    try:
+        mappings = load_manifest(manifest_path)
+    except (IOError, ValueError) as e:
+        forms.alert(u"Manifest fehlerhaft:\n{}".format(e), exitscript=True)
+
+    resolved = resolve_manifest(mappings, template_dict)
+    if not resolved:
+        forms.alert("Manifest: keine gültige Zuordnung.", exitscript=True)
+
+    stats, errors, result = sync_manifest(resolved)
+    show_results_compact(stats, errors, "{} Quellen (Manifest)".format(len(resolved)),
+                         len(result.succeeded) + len(result.failed))
+    log.info("Manifest: %s", result.summary())
+    log.summary()
+    script.exit()
+
 # Quell-Vorlage
 source_name = forms.SelectFromList.show(
     sorted(template_dict.keys()),
@@ -170,4 +315,5 @@ if not forms.alert(
 stats, errors = copy_filter_overrides_optimized(source_template, target_templates)
 
 # Ergebnis
-show_results_compact(stats, errors, source_name, len(target_templates))
\ No newline at end of file
+show_results_compact(stats, errors, source_name, len(target_templates))
+log.summary()
\ No newline at end of file
@@ -1,26 +1,55 @@
 # -*- coding: utf-8 -*-
 __title__ = "WallTagsDistance"
-__doc__ = "Setzt alle Wall Tags auf den gleichen Abstand zur Wand"
+__doc__ = "Setzt alle Wall Tags auf den gleichen Abstand zur Wand\n" \
+          "Shift-Klick: alle Wall Tags der ausgewählten Ansichten/Sheets ausrichten\n" \
+          "Abstände pro Tag-Typ und Entflechten überlappender Tags (avoid_overlaps):\n" \
+          "%APPDATA%/pyRevit/pyMLG_tag_distance.json"
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
-from pyrevit import revit, DB, forms
+from pyrevit import revit, DB, forms, EXEC_PARAMS
+
+import time
+
+from pymlg import tag_layout, tag_solver
+from pymlg.batch import BatchExecutor, BatchResult
+from pymlg.config import load_config
+from pymlg.log import get_logger
+from pymlg.params import ParameterCache
 
 doc = revit.doc
 uidoc = revit.uidoc
+log = get_logger("TagDistance")
 
+# Abstände in mm pro Tag-Typ ("Familie: Typ" oder nur Typname)
+DEFAULT_SETTINGS = {
+    "type_offsets_mm": {},
+    "chunk_size": 500,
+    # Überlappende Tags entlang der Wand verschieben oder Seite wechseln
+    "avoid_overlaps": False,
+}
 
-def move_tag_to_offset(tag, wall, offset):
-    """Verschiebt das Tag auf den gewünschten Abstand zur Wand"""
-    # Hole die aktuelle Position des Tags
-    tag_head = tag.TagHeadPosition
 
-    # Hole die Wandlinie
-    location_curve = wall.Location
-    if not location_curve:
-        return False
+def set_tag_position(tag, new_position, elbow):
+    """Setzt Tag-Kopf und (falls vorhanden) den Leader-Knick"""
+    tag.TagHeadPosition = new_position
+
+    # KORREKTUR: Überprüfe ob Tag einen Leader hat UND ob LeaderElbow existiert
+    if tag.HasLeader:
+        try:
+            tag.LeaderEndCondition = LeaderEndCondition.Free
+            # Versuche LeaderElbow zu setzen (funktioniert nicht bei allen Tag-Typen)
+            if hasattr(tag, 'LeaderElbow'):
+                tag.LeaderElbow = elbow
+        except:
+            # Wenn LeaderElbow nicht funktioniert, ignoriere es
+            pass
 
-    curve = location_curve.Curve
+
+def move_tag_to_offset(tag, curve, offset):
+    """Verschiebt das Tag auf den gewünschten Abstand zur Wand (Einzelfall, z.B. Bogenwand)"""
+    # Hole die aktuelle Position des Tags
+    tag_head = tag.TagHeadPosition
 
     # Finde den nächsten Punkt auf der Wandlinie zum Tag
     result = curve.Project(tag_head)
@@ -32,33 +61,124 @@ def move_tag_to_offset(tag, wall, offset):
 
         # Berechne die neue Position mit dem gewünschten Abstand
         new_position = closest_point - direction_to_wall * offset
+        elbow = closest_point - direction_to_wall * (offset * tag_solver.ELBOW_RATIO)
 
-        # Setze die neue Position
-        tag.TagHeadPosition = new_position
-
-        # KORREKTUR: Überprüfe ob Tag einen Leader hat UND ob LeaderElbow existiert
-        if tag.HasLeader:
-            try:
-                tag.LeaderEndCondition = LeaderEndCondition.Free
-                # Versuche LeaderElbow zu setzen (funktioniert nicht bei allen Tag-Typen)
-                if hasattr(tag, 'LeaderElbow'):
-                    tag.LeaderElbow = closest_point - direction_to_wall * (offset * 0.7)
-            except:
-                # Wenn LeaderElbow nicht funktioniert, ignoriere es
-                pass
-
+        set_tag_position(tag, new_position, elbow)
         return True
     return False
 
 
+def tagged_wall(tag):
+    """Erste getaggte Wand eines Tags (ohne das HashSet in eine Liste zu kopieren)"""
+    tagged_element_ids = tag.GetTaggedLocalElementIds()
+    if not tagged_element_ids or tagged_element_ids.Count == 0:
+        return None
+    for element_id in tagged_element_ids:
+        return doc.GetElement(element_id)
+
+
+def as_tuple(point):
+    return (point.X, point.Y, point.Z)
+
+
+def target_view_ids():
+    """Shift-Klick: ausgewählte Ansichten/Sheets (Sheets -> platzierte Ansichten)"""
+    elements = [doc.GetElement(elem_id) for elem_id in uidoc.Selection.GetElementIds()]
+    if not any(isinstance(elem, View) for elem in elements):
+        elements = forms.select_views(title="Ansichten/Sheets wählen", multiple=True) or []
+
+    view_ids = set()
+    for elem in elements:
+        if isinstance(elem, ViewSheet):
+            view_ids.update(view_id.IntegerValue for view_id in elem.GetAllPlacedViews())
+        elif isinstance(elem, View):
+            view_ids.add(elem.Id.IntegerValue)
+    return view_ids
+
+
+def collect_wall_tags(view_ids):
+    """Ein projektweiter Collector, gruppiert nach Ansicht: {view_id (int): [tags]}"""
+    collector = FilteredElementCollector(doc) \
+        .OfCategory(BuiltInCategory.OST_WallTags) \
+        .WhereElementIsNotElementType()
+
+    tags_by_view = dict((view_id, []) for view_id in view_ids)
+    for tag in collector:
+        tags = tags_by_view.get(tag.OwnerViewId.IntegerValue)
+        if tags is not None:
+            tags.append(tag)
+    return tags_by_view
+
+
+def tag_offsets(tags, default_offset, type_offsets_mm):
+    """Abstand (Fuß) pro Tag aus den Typ-Regeln, sonst der Standard-Abstand"""
+    if not type_offsets_mm:
+        return [default_offset] * len(tags)
+
+    type_params = ParameterCache(doc)
+    by_type = {}
+    offsets = []
+    for tag in tags:
+        type_id = tag.GetTypeId()
+        offset = by_type.get(type_id.IntegerValue)
+        if offset is None:
+            full_name = type_params.get(type_id, BuiltInParameter.SYMBOL_FAMILY_AND_TYPE_NAMES_PARAM, u"")
+            type_name = full_name.split(":")[-1].strip()
+            mm = type_offsets_mm.get(full_name, type_offsets_mm.get(type_name))
+            offset = by_type[type_id.IntegerValue] = mm / 304.8 if mm is not None else default_offset
+        offsets.append(offset)
+    return offsets
+
+
+def resolve_overlaps(tags, heads, starts, ends):
+    """
+    Anordnungs-Durchlauf pro Ansicht: überlappende Tags werden verschoben
+    Returns: (heads, elbows) für alle Tags in der Eingabe-Reihenfolge
+    """
+    new_heads = list(heads)
+    new_elbows = [None] * len(tags)
+
+    by_view = {}
+    for index, tag in enumerate(tags):
+        by_view.setdefault(tag.OwnerViewId.IntegerValue, []).append(index)
+
+    for view_id, indices in by_view.items():
+        view = doc.GetElement(ElementId(view_id))
+        specs = []
+        for index in indices:
+            bbox = tags[index].get_BoundingBox(view)
+            half_width = (bbox.Max.X - bbox.Min.X) / 2.0 if bbox else 0.0
+            half_height = (bbox.Max.Y - bbox.Min.Y) / 2.0 if bbox else 0.0
+            specs.append(tag_layout.TagSpec(heads[index], starts[index], ends[index], half_width, half_height))
+
+        layout = tag_layout.layout_tags(specs)
+        if log.debug_enabled:
+            log.debug("Ansicht %s: %s", view.Name, layout.summary())
+        for index, head, elbow in zip(indices, layout.heads, layout.elbows):
+            new_heads[index] = head
+            new_elbows[index] = elbow
+
+    return new_heads, new_elbows
+
+
+settings = load_config("tag_distance", DEFAULT_SETTINGS)
+multi_view = EXEC_PARAMS.config_mode
+
 # Sammle alle Wall Tags
-collector = FilteredElementCollector(doc, doc.ActiveView.Id) \
-    .OfCategory(BuiltInCategory.OST_WallTags) \
-    .WhereElementIsNotElementType()
+if multi_view:
+    tags_by_view = collect_wall_tags(target_view_ids())
+else:
+    tags_by_view = {doc.ActiveView.Id.IntegerValue: list(
+        FilteredElementCollector(doc, doc.ActiveView.Id)
+        .OfCategory(BuiltInCategory.OST_WallTags)
+        .WhereElementIsNotElementType())}
 
-wall_tags = list(collector)
+wall_tags = [tag for tags in tags_by_view.values() for tag in tags]
+view_count = len([tags for tags in tags_by_view.values() if tags])
 
 if not wall_tags:
+    if multi_view:
+        forms.alert("Keine Wall Tags in den gewählten Ansichten gefunden.", exitscript=True)
     forms.alert("Keine Wall Tags in der aktuellen Ansicht gefunden.", exitscript=True)
 
 # Frage den Benutzer nach dem gewünschten Abstand
@@ -79,44 +199,112 @@ if distance_input:
 else:
     DESIRED_OFFSET = 500 / 304.8
 
-# Starte eine Transaction
-t = Transaction(doc, "Wall Tags ausrichten")
-t.Start()
+offsets = tag_offsets(wall_tags, DESIRED_OFFSET, settings["type_offsets_mm"])
 
-success_count = 0
+# Tags aufteilen: gerade Wände -> Batch-Löser, sonst Einzelberechnung
+line_tags = []
+heads = []
+starts = []
+ends = []
+line_offsets = []
+curve_tags = []
 failed_count = 0
 
+for tag, offset in zip(wall_tags, offsets):
+    wall = tagged_wall(tag)
+    if wall is None:
+        failed_count += 1
+        log.debug("Tag %s: kein getaggtes Element", tag.Id)
+        continue
+    if not isinstance(wall, Wall):
+        failed_count += 1
+        log.debug("Tag %s: getaggtes Element ist keine Wand", tag.Id)
+        continue
+
+    location_curve = wall.Location
+    curve = location_curve.Curve if location_curve else None
+    if curve is None:
+        failed_count += 1
+        log.debug("Tag %s: Wand ohne Wandlinie", tag.Id)
+    elif isinstance(curve, Line):
+        line_tags.append(tag)
+        heads.append(as_tuple(tag.TagHeadPosition))
+        starts.append(as_tuple(curve.GetEndPoint(0)))
+        ends.append(as_tuple(curve.GetEndPoint(1)))
+        line_offsets.append(offset)
+    else:
+        curve_tags.append((tag, curve, offset))
+
+with log.timer("Batch-Löser ({} Tags)".format(len(line_tags))):
+    new_heads, elbows = tag_solver.solve_offsets(heads, starts, ends, line_offsets)
+
+if settings["avoid_overlaps"]:
+    with log.timer("Anordnung ({} Tags)".format(len(line_tags))):
+        new_heads, elbows = resolve_overlaps(line_tags, new_heads, starts, ends)
+
+# Gerade Wände: Position steht fest, Bogenwände: Einzelberechnung
+moves = [(tag, XYZ(*head), XYZ(*elbow)) for tag, head, elbow in zip(line_tags, new_heads, elbows)]
+moves.extend(curve_tags)
+
+
+def apply_move(move):
+    """(tag, head, elbow) für gerade Wände, (tag, curve, offset) sonst"""
+    tag, target, value = move
+    if isinstance(target, XYZ):
+        set_tag_position(tag, target, value)
+    elif not move_tag_to_offset(tag, target, value):
+        raise Exception("keine Projektion auf Wandlinie")
+    return tag
+
+
+def run_single_view(moves):
+    """
+    Aktuelle Ansicht: eine Transaction für alle Tags, ohne SubTransaction pro Tag
+    Returns: BatchResult (wie BatchExecutor.run)
+    """
+    result = BatchResult()
+    start = time.time()
+
+    t = Transaction(doc, "Wall Tags ausrichten")
+    t.Start()
+    try:
+        for move in moves:
+            try:
+                result.succeeded.append(apply_move(move))
+            except Exception as e:
+                result.failed.append((move, e))
+        t.Commit()
+    except Exception:
+        t.RollBack()
+        raise
+
+    result.chunks = 1
+    result.elapsed = time.time() - start
+    return result
+
+
 try:
-    for tag in wall_tags:
-        # Hole die verknüpfte Wand
-        tagged_element_ids = tag.GetTaggedLocalElementIds()
-
-        # Konvertiere HashSet zu Liste
-        if tagged_element_ids and tagged_element_ids.Count > 0:
-            # Hole das erste Element aus dem HashSet
-            element_id = list(tagged_element_ids)[0]
-            wall = doc.GetElement(element_id)
-
-            if wall and isinstance(wall, Wall):
-                if move_tag_to_offset(tag, wall, DESIRED_OFFSET):
-                    success_count += 1
-                else:
-                    failed_count += 1
-            else:
-                failed_count += 1
-        else:
-            failed_count += 1
-
-    t.Commit()
+    if multi_view:
+        # Chunk-Transactions in einer TransactionGroup, ein Undo-Eintrag
+        result = BatchExecutor(doc, "Wall Tags ausrichten", settings["chunk_size"]).run(moves, apply_move)
+    else:
+        result = run_single_view(moves)
+
+    for move, ex in result.failed:
+        failed_count += 1
+        log.debug("Tag %s: %s", move[0].Id, ex)
 
     # Zeige Ergebnis
     message = "Fertig!\n\n"
-    message += "{} Wall Tags erfolgreich ausgerichtet\n".format(success_count)
+    message += "{} Wall Tags erfolgreich ausgerichtet\n".format(len(result.succeeded))
+    if multi_view:
+        message += "in {} Ansichten ({:.0f} Tags/s)\n".format(view_count, result.items_per_second)
     if failed_count > 0:
         message += "{} Wall Tags konnten nicht ausgerichtet werden".format(failed_count)
 
     forms.alert(message, title="Ergebnis")
+    log.info("Wall Tags: %s", result.summary())
+    log.summary()
 
 except Exception as e:
-    t.RollBack()
-    forms.alert("Fehler: {}".format(str(e)), title="Fehler")
\ No newline at end of file
+    forms.alert("Fehler: {}".format(str(e)), title="Fehler")
@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
-__doc__ = "ExcelExport Exportiert ausgewählte Listen nach Excel"
+__doc__ = "ViewIdVisible Exportiert ausgewählte Listen nach Excel und füllt leere Zellen " \
+          "von Element-Zeilen aus den Parametern der Elemente\n" \
+          "Shift-Klick: Export über Microsoft Excel (Interop)"
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
-from pyrevit import revit, forms
+from pyrevit import revit, forms, EXEC_PARAMS
 import sys
 import subprocess
 import clr
-import System
 
-clr.AddReference("Microsoft.Office.Interop.Excel")
-from Microsoft.Office.Interop import Excel
+from pymlg import excel_export
+from pymlg.log import get_logger
+from pymlg.params import ParameterCache
+from pymlg.schedule_rows import build_row_index
+from pymlg.schedule_snapshot import ScheduleSnapshot, parameter_text
+
+log = get_logger("ViewIdVisible")
 
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
@@ -48,101 +54,71 @@ if not datei_pfad:
 if selected_names and datei_pfad:
     print("User selected:" + datei_pfad)
 
-    # Excel starten
-    excel_app = Excel.ApplicationClass()
-    excel_app.Visible = False
-    workbook = excel_app.Workbooks.Add()
-
-    # Datenschleife um Excel zu füllen:
-    for name in selected_names:
-        schedule_obj = schedule_dict[name]
-
-        # TableData holen
-        tableData = schedule_obj.GetTableData()
-        sectionData = tableData.GetSectionData(SectionType.Body)
-        headerData = tableData.GetSectionData(SectionType.Header)
-
-        # Worksheet erstellen
-        worksheet = workbook.Worksheets.Add()
-        worksheet.Name = name
-
-        # Header-Zeilen kopieren (falls vorhanden)
-        if headerData:
-            header_rows = headerData.NumberOfRows
-            header_cols = headerData.NumberOfColumns
-            for row in range(header_rows):
-                for col in range(header_cols):
-                    wert = headerData.GetCellText(row, col)
-                    worksheet.Cells[row + 1, col + 1] = wert
-            start_row = header_rows + 1
-        else:
-            start_row = 1
-
-        # Body-Zeilen kopieren (HYBRID: GetCellText + direkter Parameter-Zugriff)
-        body_rows = sectionData.NumberOfRows
-        body_cols = sectionData.NumberOfColumns
-
-        # Elemente aus Schedule holen
-        collector = FilteredElementCollector(doc, schedule_obj.Id)
-        element_list = list(collector.ToElements())
-
-        schedule_definition = schedule_obj.Definition
-        field_count = schedule_definition.GetFieldCount()
-
-        element_index = 0
-
-        for row in range(body_rows):
-            # Prüfe ob es eine Element-Zeile ist (nicht Gruppierung/Summe)
-            first_cell = sectionData.GetCellText(row, 0)
-
-            # Wenn erste Spalte nicht leer → könnte Element-Zeile sein
-            is_element_row = first_cell != "" and element_index < len(element_list)
-
-            print("Zeile " + str(row) + ": first_cell='" + first_cell + "', is_element_row=" + str(
-                is_element_row) + ", element_index=" + str(element_index))  # DEBUG
-
-            for col in range(body_cols):
-                wert = sectionData.GetCellText(row, col)
-
-                print("  Spalte " + str(col) + ": GetCellText='" + wert + "'")  # DEBUG
-
-                # Wenn Wert leer UND es ist eine Element-Zeile → vom Element holen
-                if wert == "" and is_element_row:
-                    element = element_list[element_index]
-                    field = schedule_definition.GetField(col)
-                    param_id = field.ParameterId
-
-                    print("    Versuche Parameter zu holen: param_id=" + str(param_id.IntegerValue))  # DEBUG
-
-                    # Versuche Parameter zu holen
-                    try:
-                        built_in = System.Enum.ToObject(BuiltInParameter, param_id.IntegerValue)
-                        param = element.get_Parameter(built_in)
-
-                        print("    param gefunden: " + str(param is not None))  # DEBUG
-
-                        if param:
-                            if param.StorageType == StorageType.String:
-                                wert = param.AsString() or ""
-                            elif param.StorageType == StorageType.Double:
-                                wert = param.AsValueString() or ""
-                            elif param.StorageType == StorageType.Integer:
-                                wert = str(param.AsInteger())
-                            print("    Wert aus Parameter: '" + wert + "'")  # DEBUG
-                    except Exception as e:
-                        print("    Fehler: " + str(e))  # DEBUG
-                        wert = ""
-
-                worksheet.Cells[row + start_row, col + 1] = wert
-
-            # Erhöhe element_index nur bei Element-Zeilen
-            if is_element_row:
-                element_index += 1
-
-    # Speichern
-    workbook.SaveAs(datei_pfad)
-    workbook.Close()
-    excel_app.Quit()
+    # Shift-Klick: Export über Excel (Interop) statt über den internen XLSX-Writer
+    backend = excel_export.BACKEND_INTEROP if EXEC_PARAMS.config_mode else excel_export.BACKEND_XLSX
+
+    # Arbeitsmappe wird auch bei Fehlern geschlossen (Excel-Prozess/Temp-Ordner)
+    with excel_export.open_workbook(datei_pfad, backend) as workbook:
+        # Parameter-Texte über alle Schedules gemeinsam zwischenspeichern
+        params = ParameterCache(doc, reader=parameter_text)
+
+        # Datenschleife um Excel zu füllen:
+        for name in selected_names:
+            schedule_obj = schedule_dict[name]
+
+            # TableData holen
+            tableData = schedule_obj.GetTableData()
+            headerData = tableData.GetSectionData(SectionType.Header)
+
+            # Body einmal komplett einlesen (Felder/Parameter einmal pro Spalte aufgelöst)
+            with log.timer("Auslesen"):
+                snapshot = ScheduleSnapshot.from_schedule(schedule_obj)
+
+            # Worksheet erstellen
+            worksheet = workbook.add_sheet(name)
+
+            # Header-Zeilen kopieren (falls vorhanden)
+            worksheet.write_rows(excel_export.iter_section_rows(headerData))
+
+            # Body-Zeilen kopieren (HYBRID: GetCellText + direkter Parameter-Zugriff)
+            # Exakte Zuordnung Zeile -> Element (unabhängig von Gruppierung/Sortierung)
+            row_index = build_row_index(doc, schedule_obj)
+
+            if row_index is not None:
+                row_elements = row_index.elements(doc)
+                log.debug("%s: Zeilenindex mit %s Element-Zeilen", name, len(row_elements))
+            else:
+                # Fallback ohne Kommentar-Parameter: Heuristik über die erste Spalte
+                log.warning("%s: kein exakter Zeilenindex möglich, Heuristik über erste Spalte", name)
+                collector = FilteredElementCollector(doc, schedule_obj.Id)
+                element_list = list(collector.ToElements())
+
+                element_index = 0
+                row_elements = {}
+
+                for row in range(snapshot.n_rows):
+                    # Wenn erste Spalte nicht leer → könnte Element-Zeile sein
+                    first_cell = snapshot.cell(row, 0)
+                    is_element_row = first_cell != "" and element_index < len(element_list)
+
+                    if log.debug_enabled:
+                        log.debug("Zeile %s: first_cell='%s', is_element_row=%s, element_index=%s",
+                                  row, first_cell, is_element_row, element_index)
+
+                    # Erhöhe element_index nur bei Element-Zeilen
+                    if is_element_row:
+                        row_elements[row] = element_list[element_index]
+                        element_index += 1
+
+            # Leere Zellen von Element-Zeilen aus den Parametern füllen
+            with log.timer("Parameter"):
+                filled = snapshot.fill_missing(row_elements, params)
+            log.debug("%s: %s Zellen aus Parametern gefüllt", name, filled)
+
+            worksheet.write_rows(snapshot.iter_rows())
+
     print("Excel wurde erstellt!")
+    log.debug("%s Parameter gelesen", params.reads)
+    log.summary()
 else:
     print("User didn't selected anything")
\ No newline at end of file
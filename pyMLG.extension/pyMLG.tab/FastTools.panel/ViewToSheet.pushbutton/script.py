@@ -1,73 +1,93 @@
 # -*- coding: utf-8 -*-
+__doc__ = "Erstellt für jede ausgewählte Ansicht ein Sheet\n" \
+          "Shift-Klick: mehrere Ansichten pro Sheet (nach Größe gepackt)\n" \
+          "Plankopf, Vorlage, Nummern und Layout-Bereich: %APPDATA%/pyRevit/pyMLG_view_to_sheet.json"
+
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
+from pyrevit import EXEC_PARAMS
+
+from pymlg import catalog, sheet_layout
+from pymlg.batch import BatchExecutor
+from pymlg.config import config_path, load_config
+from pymlg.log import get_logger
+from pymlg.name_index import sheet_number_index
+
+log = get_logger("ViewToSheet")
 
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
 
+CM_PER_FOOT = 30.48
+
+DEFAULT_SETTINGS = {
+    # Plankopf als "Familie: Typ"
+    "titleblock": "B+K Plankopf BA A3: B+K Plankopf BA A3",
+    # Ansichtsvorlage ("" = keine Vorlage anwenden)
+    "template": "WIP_Wall_Control",
+    "sheet_prefix": "AP",
+    # Eine Ansicht pro Sheet: Mittelpunkt des Viewports
+    "point_cm": [-57.0, 40.0],
+    # Shift-Klick: Bereich für mehrere Ansichten (linke obere Ecke, Größe)
+    "area_cm": {"left": -82.0, "top": 55.0, "width": 50.0, "height": 30.0},
+    "gap_cm": 1.0,
+    # Höchstens so viele Ansichten pro Sheet (0 = so viele wie passen)
+    "views_per_sheet": 0,
+    "chunk_size": 50,
+}
+
+settings = load_config("view_to_sheet", DEFAULT_SETTINGS)
+pack_views = EXEC_PARAMS.config_mode
+
 
 #_________________________________________________________________________
 #_________________________________________________________________________
 # Nombre de la plantilla que quieres aplicar
-template_name = "WIP_Wall_Control"
+template_name = settings["template"]
 
-# Buscar la plantilla
-templates = FilteredElementCollector(doc).OfClass(View).ToElements()
+# Buscar la plantilla (catalogo en cache)
 template = None
-for t in templates:
-    if t.IsTemplate and t.Name == template_name:
-        template = t
-        break
-
-if not template:
-    raise Exception("No se encontró la plantilla con el nombre especificado.")
-
-# Vista seleccionada (ejemplo: primera vista seleccionada)
-selected_ids = uidoc.Selection.GetElementIds()
-if not selected_ids:
-    raise Exception("Selecciona una vista primero.")
-
-view = doc.GetElement(selected_ids[0])
-if not isinstance(view, View):
-    raise Exception("El elemento seleccionado no es una vista.")
+if template_name:
+    template = catalog.find(doc, catalog.TEMPLATES, template_name)
+    if not template:
+        raise Exception("No se encontró la plantilla con el nombre especificado: {}".format(template_name))
 
 #_________________________________________________________________________
 #_________________________________________________________________________
 
+# Index aller Blattnummern (einmal aufgebaut, neue Nummern werden ergänzt)
+sheet_numbers = sheet_number_index(doc)
+
+
 # Funktion für eindeutige Blattnummer
 def get_unique_sheet_number(prefix, start):
-    existing_numbers = {s.SheetNumber for s in FilteredElementCollector(doc).OfClass(ViewSheet)}
-    num = start
-    while "{}-{:03d}".format(prefix, num) in existing_numbers:
-        num += 1
-    return "{}-{:03d}".format(prefix, num)
+    return sheet_numbers.next_free(prefix, u"{}-{:03d}", start=start)
+
+
+def name_parts(name):
+    return [p.strip() for p in name.split(":")]
 
 #_________________________________________________________________________
 #_________________________________________________________________________
 
-# Alle Plankopf-Typen sammeln
-titleblock_types = FilteredElementCollector(doc)\
-    .OfCategory(BuiltInCategory.OST_TitleBlocks)\
-    .WhereElementIsElementType()\
-    .ToElements()
+# Alle Plankopf-Typen (Katalog-Cache: "Familie: Typ" und Id)
+titleblock_entries = catalog.entries(doc, catalog.TITLEBLOCK_TYPES)
 
-if not titleblock_types:
+if not titleblock_entries:
     TaskDialog.Show("Fehler", "Keine Planvorlage (Titleblock) im Projekt gefunden.")
     raise SystemExit
 
-# Plankopf mit Name "A0" suchen
-
+# Plankopf aus den Einstellungen suchen
 titleblock_type = None
-for tb in titleblock_types:
-    tb_name = tb.get_Parameter(BuiltInParameter.SYMBOL_FAMILY_AND_TYPE_NAMES_PARAM).AsString()
-    if tb_name:
-        parts = [p.strip() for p in tb_name.split(":")]
-        if len(parts) == 2 and parts[0] == "B+K Plankopf BA A3" and parts[1] == "B+K Plankopf BA A3":
-            titleblock_type = tb
-            break
+wanted_titleblock = name_parts(settings["titleblock"])
+for tb_name, tb_id in titleblock_entries:
+    if tb_name and name_parts(tb_name) == wanted_titleblock:
+        titleblock_type = doc.GetElement(ElementId(tb_id))
+        break
 
 if not titleblock_type:
-    TaskDialog.Show("Fehler", "Kein Titleblock mit diesem Namen gefunden.")
+    TaskDialog.Show("Fehler", "Kein Titleblock '{}' gefunden.\n\nEinstellungen: {}".format(
+        settings["titleblock"], config_path("view_to_sheet")))
     raise SystemExit
 
 # Aktuelle Auswahl filtern
@@ -84,41 +104,97 @@ if not views:
 
 
 #_________________________________________________________________________________________
-#AUSFÜHRUNG TRANSACTION
+#LAYOUT
 #_________________________________________________________________________________________
 
-t = Transaction(doc, "Create Sheet View")
-t.Start()
+def cm_to_ft(value):
+    return value / CM_PER_FOOT
 
-for i, view in enumerate(views):
-    try:
-        # Aplicar la plantilla
-        view.ViewTemplateId = template.Id
-# ________________________________________________________________________________________
-#________________________________________________________________________________________
-        new_sheet = ViewSheet.Create(doc, titleblock_type.Id)
-        new_sheet.Name = view.Name
-        new_sheet.SheetNumber = get_unique_sheet_number("AP", i + 1)
 
-        x_cm = -57.0
-        y_cm = 40.0
+def apply_template(view):
+    # Aplicar la plantilla
+    view.ViewTemplateId = template.Id
+    return view
 
-        # Umrechnung in Fuß
-        x_ft = x_cm / 30.48
-        y_ft = y_cm / 30.48
 
-        # Punkt erstellen
-        point = XYZ(x_ft, y_ft, 0)
+def view_size(view):
+    """Größe der Ansicht auf dem Sheet (Fuß), nach Anwenden der Vorlage"""
+    outline = view.Outline
+    return outline.Max.U - outline.Min.U, outline.Max.V - outline.Min.V
 
-        # Ansicht platzieren
+
+def sheet_layouts(views):
+    """
+    Verteilung der Ansichten auf Sheets
+    Returns: list[list[(view, XYZ)]] - ein Eintrag pro Sheet
+    """
+    if not pack_views:
+        point = XYZ(cm_to_ft(settings["point_cm"][0]), cm_to_ft(settings["point_cm"][1]), 0)
+        return [[(view, point)] for view in views]
+
+    area = settings["area_cm"]
+    left, top = cm_to_ft(area["left"]), cm_to_ft(area["top"])
+    items = [(i, ) + view_size(view) for i, view in enumerate(views)]
+    sheets = sheet_layout.pack_shelves(
+        items, cm_to_ft(area["width"]), cm_to_ft(area["height"]),
+        cm_to_ft(settings["gap_cm"]), settings["views_per_sheet"])
+
+    log.info("%s Ansichten auf %s Sheets, Füllgrad %.0f%%", len(views), len(sheets),
+             100 * sheet_layout.fill_ratio(sheets, cm_to_ft(area["width"]), cm_to_ft(area["height"])))
+    return [[(views[p.key], XYZ(left + p.x, top - p.y, 0)) for p in placements] for placements in sheets]
+
+
+#_________________________________________________________________________________________
+#AUSFÜHRUNG TRANSACTION
+#_________________________________________________________________________________________
+
+def create_sheet(item):
+    i, placements = item
+
+    new_sheet = ViewSheet.Create(doc, titleblock_type.Id)
+    new_sheet.Name = placements[0][0].Name
+    new_sheet.SheetNumber = get_unique_sheet_number(settings["sheet_prefix"], i + 1)
+
+    # Ansichten platzieren
+    for view, point in placements:
         vp = Viewport.Create(doc, new_sheet.Id, view.Id, point)
         if vp is None:
-            print("Viewport konnte nicht erstellt werden für:", view.Name)
+            log.warning("Viewport konnte nicht erstellt werden für: %s", view.Name)
+
+        log.info("Plan erstellt für Ansicht: %s", view.Name)
+    return new_sheet
+
+
+# Alles in einer TransactionGroup: ein Undo-Eintrag
+group = TransactionGroup(doc, "Create Sheet View")
+group.Start()
+
+try:
+    # 1. Vorlage anwenden (bestimmt Maßstab/Zuschnitt und damit die Größe auf dem Sheet)
+    if template:
+        template_result = BatchExecutor(doc, "Apply View Template", settings["chunk_size"]).run(views, apply_template)
+        for view, e in template_result.failed:
+            log.error("Vorlage für %s: %s", view.Name, e)
+
+    # 2. Layout berechnen, 3. Sheets in Chunk-Transactions erstellen
+    # (eine fehlerhafte Sheet rollt nur sich selbst zurück)
+    with log.timer("Layout"):
+        layouts = sheet_layouts(views)
+    result = BatchExecutor(doc, "Create Sheet View", settings["chunk_size"]).run(enumerate(layouts), create_sheet)
+except Exception:
+    group.RollBack()
+    raise
+
+if result.succeeded:
+    group.Assimilate()
+else:
+    group.RollBack()
 
-        print("Plan erstellt für Ansicht:", view.Name)
-    except Exception as e:
-        print("Fehler bei {}: {}".format(view.Name, e))
+for (i, placements), e in result.failed:
+    log.error("Fehler bei %s: %s", ", ".join(view.Name for view, _ in placements), e)
 
-t.Commit()
+log.summary()
 
-TaskDialog.Show("Olé", "You created {} sheets.".format(len(views)))
\ No newline at end of file
+placed_views = sum(len(placements) for placements in layouts) - sum(len(p) for (_, p), _ in result.failed)
+TaskDialog.Show("Olé", "You created {} sheets with {} views ({:.1f} sheets/s).".format(
+    len(result.succeeded), placed_views, result.items_per_second))
@@ -1,67 +1,54 @@
 # -*- coding: utf-8 -*-
 """Crear Secciones por Tipo de Muro
 Crea automaticamente una seccion por cada tipo de muro usado en el proyecto
+Shift-Click: exportar ademas la tabla de capas (CSV)
 """
 __title__ = 'WallLegend'
 __author__ = 'Manuel'
 
-from pyrevit import revit, DB, forms, script
+from pyrevit import revit, DB, forms, script, EXEC_PARAMS
+
+from pymlg import catalog, wall_legend
+from pymlg.log import get_logger
+from pymlg.name_index import view_name_index
+from pymlg.params import ParameterCache
 
 doc = revit.doc
 uidoc = revit.uidoc
+log = get_logger('WallLegend')
 
-# Recopilar todos los muros del proyecto
-all_walls_collector = DB.FilteredElementCollector(doc) \
-    .OfClass(DB.Wall) \
-    .WhereElementIsNotElementType()
-
-all_walls = list(all_walls_collector)
+# Agrupar muros por tipo en una sola pasada (un muro representativo por tipo)
+with log.timer('Agrupar muros por tipo'):
+    wall_groups = wall_legend.group_walls_by_type(doc)
 
-if not all_walls:
+if not wall_groups:
     forms.alert('No hay muros en el proyecto', exitscript=True)
 
-print('\nTotal de muros en proyecto: {}'.format(len(all_walls)))
+print('\nTotal de muros en proyecto: {}'.format(sum(group.count for group in wall_groups)))
 
-# Agrupar muros por tipo
+# Tipos sin muro con linea de ubicacion no se pueden cortar
 wall_types_dict = {}
-
-for wall in all_walls:
-    try:
-        wall_type_id = wall.GetTypeId()
-        type_id_int = wall_type_id.IntegerValue
-
-        if type_id_int not in wall_types_dict:
-            wall_type = doc.GetElement(wall_type_id)
-
-            if wall_type:
-                # Obtener nombre del tipo de forma segura
-                try:
-                    type_name = wall_type.get_Parameter(DB.BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-                except:
-                    type_name = "Tipo_{}".format(type_id_int)
-
-                wall_types_dict[type_id_int] = {
-                    'type': wall_type,
-                    'type_name': type_name,
-                    'walls': []
-                }
-
-        wall_types_dict[type_id_int]['walls'].append(wall)
-
-    except:
+for group in wall_groups:
+    if group.representative is None:
+        log.warning('Tipo "%s" sin muro con linea de ubicacion', group.type_name)
         continue
+    wall_types_dict[group.type_id.IntegerValue] = group
 
 if not wall_types_dict:
     forms.alert('No se pudieron procesar los tipos de muro', exitscript=True)
 
+# Alturas de los muros representativos en una pasada
+params = ParameterCache(doc, [DB.BuiltInParameter.WALL_USER_HEIGHT_PARAM])
+params.load_elements(group.representative for group in wall_types_dict.values())
+
 # Mostrar tipos encontrados
 print('\n' + '=' * 70)
 print('TIPOS DE MURO ENCONTRADOS:')
 print('=' * 70)
 
 for type_id, data in wall_types_dict.items():
-    print('\n- {}'.format(data['type_name']))
-    print('  Cantidad: {} muros'.format(len(data['walls'])))
+    print('\n- {}'.format(data.type_name))
+    print('  Cantidad: {} muros'.format(data.count))
 
 # Confirmar
 msg = 'Se encontraron {} tipos de muro diferentes.\n\n'.format(len(wall_types_dict))
@@ -72,9 +59,7 @@ if not forms.alert(msg, yes=True, no=True):
 
 # Buscar tipo de seccion
 section_type_id = None
-collector = DB.FilteredElementCollector(doc).OfClass(DB.ViewFamilyType)
-
-for vft in collector:
+for vft in catalog.view_family_types(doc):
     if vft.ViewFamily == DB.ViewFamily.Section:
         section_type_id = vft.Id
         break
@@ -84,167 +69,91 @@ if not section_type_id:
 
 # Procesar cada tipo de muro
 output = script.get_output()
+view_names = view_name_index(doc)
 created_sections = []
 errors = []
 
-with revit.Transaction('Crear Secciones por Tipo de Muro'):
+# Transaccion de la cache de parametros: se vacia al terminar
+with params.transaction('Crear Secciones por Tipo de Muro'):
     for type_id, data in wall_types_dict.items():
         try:
-            wall_type_name = data['type_name']
-            representative_wall = data['walls'][0]
+            wall_type_name = data.type_name
+            representative_wall = data.representative
             wall_id = representative_wall.Id.IntegerValue
 
-            print('\n' + '-' * 70)
-            print('Procesando: {}'.format(wall_type_name))
-            print('Muro ID: {}'.format(wall_id))
-
-            # Datos del muro
-            loc = representative_wall.Location
-            curve = loc.Curve
-            p1 = curve.GetEndPoint(0)
-            p2 = curve.GetEndPoint(1)
-
-            # Punto medio
-            mid_x = (p1.X + p2.X) / 2.0
-            mid_y = (p1.Y + p2.Y) / 2.0
-            mid_z = (p1.Z + p2.Z) / 2.0
-            midpoint = DB.XYZ(mid_x, mid_y, mid_z)
-
-            # Direccion del muro
-            dx = p2.X - p1.X
-            dy = p2.Y - p1.Y
-            wall_length = (dx * dx + dy * dy) ** 0.5
-
-            if wall_length > 0:
-                wall_dir_x = dx / wall_length
-                wall_dir_y = dy / wall_length
-            else:
-                wall_dir_x = 1.0
-                wall_dir_y = 0.0
-
-            wall_direction = DB.XYZ(wall_dir_x, wall_dir_y, 0)
-            view_direction = DB.XYZ(-wall_dir_y, wall_dir_x, 0)
-
-            # Altura
-            height = 10.0
-            try:
-                h_param = representative_wall.get_Parameter(DB.BuiltInParameter.WALL_USER_HEIGHT_PARAM)
-                if h_param:
-                    h = h_param.AsDouble()
-                    if h > 0:
-                        height = h
-            except:
-                pass
-
-            # Ancho
-            width = representative_wall.WallType.Width
-
-            # BoundingBox
-            bbox = DB.BoundingBoxXYZ()
-
-            transform = DB.Transform.Identity
-            transform.Origin = midpoint
-            transform.BasisX = view_direction
-            transform.BasisY = DB.XYZ.BasisZ
-            transform.BasisZ = wall_direction
+            log.debug('Procesando: %s (Muro ID: %s)', wall_type_name, wall_id)
 
-            bbox.Transform = transform
-
-            # Dimensiones
-            margin = 1.0
-            cut_depth = width / 2.0 + 0.2
-            view_width = height + margin * 2
-
-            bbox.Min = DB.XYZ(-cut_depth, -margin, -view_width / 2)
-            bbox.Max = DB.XYZ(cut_depth, height + margin, view_width / 2)
+            # Caja de seccion perpendicular al muro, en el punto medio
+            height = params.get(representative_wall, DB.BuiltInParameter.WALL_USER_HEIGHT_PARAM)
+            bbox = wall_legend.section_box(representative_wall, height)
+            width = representative_wall.WallType.Width
 
             # Crear seccion
             section = DB.ViewSection.CreateSection(doc, section_type_id, bbox)
             section.Scale = 10
             section.DetailLevel = DB.ViewDetailLevel.Fine
 
-            # Nombre limpio
-            clean_name = wall_type_name.replace('/', '-').replace('\\', '-').replace(':', '-')
-            clean_name = clean_name.replace(' ', '_')
-
-            if len(clean_name) > 40:
-                clean_name = clean_name[:40]
+            # Asignar nombre (sin duplicados)
+            base_name = wall_legend.section_name(wall_type_name)
+            section.Name = view_names.next_free(base_name, u"{}_{}", try_base=True)
 
-            # Asignar nombre
-            counter = 1
-            base_name = "Seccion_{}".format(clean_name)
-            section_name = base_name
-
-            # Verificar nombres duplicados
-            all_view_names = [v.Name for v in DB.FilteredElementCollector(doc).OfClass(DB.View)]
-
-            while section_name in all_view_names:
-                section_name = "{}_{}".format(base_name, counter)
-                counter += 1
-
-            section.Name = section_name
-
-            print('Seccion creada: {}'.format(section.Name))
-            print('Ancho: {:.0f} mm'.format(width * 304.8))
+            if log.debug_enabled:
+                log.debug('Seccion creada: %s, ancho: %.0f mm', section.Name, width * 304.8)
 
             created_sections.append({
                 'section': section,
                 'wall': representative_wall,
                 'type_name': wall_type_name,
                 'wall_id': wall_id,
-                'count': len(data['walls'])
+                'count': data.count
             })
 
         except Exception as e:
-            error_msg = 'Error con tipo "{}": {}'.format(data.get('type_name', 'Desconocido'), str(e))
+            error_msg = 'Error con tipo "{}": {}'.format(data.type_name, str(e))
             errors.append(error_msg)
-            print('ERROR: {}'.format(error_msg))
+            log.error(error_msg)
+
+# Aislar muros (en bloque para todas las secciones)
+section_by_id = dict((sd['section'].Id.IntegerValue, sd) for sd in created_sections)
+section_walls = [(sd['section'], sd['wall'].Id) for sd in created_sections]
+isolation = wall_legend.ISOLATION_STRATEGY
+
+# Modo debug: comparar con el otro metodo sobre las secciones aun sin aislar
+# (recoger el contenido + HideElements), luego deshacer
+if log.debug_enabled and created_sections:
+    other = wall_legend.ISOLATE_HIDE_OTHERS if isolation == wall_legend.ISOLATE_TEMPORARY \
+        else wall_legend.ISOLATE_TEMPORARY
+    t = DB.Transaction(doc, 'Aislar Muros (comparacion)')
+    t.Start()
+    try:
+        with log.timer('Aislar ({}, {} secciones, comparacion)'.format(other, len(created_sections))):
+            wall_legend.isolate_in_sections(doc, section_walls, other)
+            doc.Regenerate()
+    finally:
+        t.RollBack()
 
-# Aislar muros
 with revit.Transaction('Aislar Muros'):
+    with log.timer('Aislar ({}, {} secciones)'.format(isolation, len(created_sections))):
+        failed = wall_legend.isolate_in_sections(doc, section_walls, isolation)
+        doc.Regenerate()
+
+    for section, e in failed:
+        log.warning('No se pudo aislar el muro en "%s": %s',
+                    section_by_id[section.Id.IntegerValue]['type_name'], e)
+
+# Tabla de capas por tipo (materiales compartidos se leen una sola vez)
+materials = wall_legend.MaterialNames(doc)
+layer_rows = []
+with log.timer('Tabla de capas'):
     for section_data in created_sections:
         try:
-            section = section_data['section']
-            wall = section_data['wall']
-            wall_id = wall.Id.IntegerValue
-
-            # Obtener elementos en vista
-            collector = DB.FilteredElementCollector(doc, section.Id)
-            all_ids = collector.WhereElementIsNotElementType().ToElementIds()
-
-            # Ocultar todo excepto el muro
-            to_hide = []
-            for elem_id in all_ids:
-                if elem_id.IntegerValue != wall_id:
-                    to_hide.append(elem_id)
-
-            if to_hide:
-                section.HideElements(list(to_hide))
-
-            # Info de capas
-            try:
-                wall_type = doc.GetElement(wall.GetTypeId())
-                structure = wall_type.GetCompoundStructure()
-
-                if structure:
-                    layers = structure.GetLayers()
-
-                    for i in range(layers.Count):
-                        layer = layers[i]
-                        width_mm = layer.Width * 304.8
-
-                        mat_id = layer.MaterialId
-                        mat_name = "Sin material"
-
-                        if mat_id != DB.ElementId.InvalidElementId:
-                            mat = doc.GetElement(mat_id)
-                            if mat:
-                                mat_name = mat.Name
-            except:
-                pass
-
-        except:
-            pass
+            wall_type = section_data['wall'].WallType
+            section_data['layers'] = wall_legend.layer_table(wall_type, section_data['type_name'], materials)
+            layer_rows.extend(section_data['layers'])
+        except Exception as e:
+            section_data['layers'] = []
+            log.warning('No se pudieron leer las capas de "%s": %s', section_data['type_name'], e)
+log.debug('%s capas, %s materiales distintos', len(layer_rows), materials.lookups)
 
 # Resultado
 output.print_md('# Resultado')
@@ -262,6 +171,17 @@ if created_sections:
         output.print_md('\n**{}. {}**'.format(idx, sd['section'].Name))
         output.print_md('- Tipo: {}'.format(sd['type_name']))
         output.print_md('- Muros de este tipo: {}'.format(sd['count']))
+        for row in sd.get('layers', []):
+            output.print_md('- Capa {}: {} {:.0f} mm, {}'.format(row.index, row.function, row.width_mm, row.material))
+
+# Shift-Click: tabla de capas como CSV
+if EXEC_PARAMS.config_mode and layer_rows:
+    csv_path = forms.save_file(file_ext='csv', default_name='Capas de muros')
+    if csv_path:
+        wall_legend.write_layer_csv(csv_path, layer_rows)
+        output.print_md('\n**Tabla de capas:** {} ({} capas)'.format(csv_path, len(layer_rows)))
+
+log.summary()
 
 print('\n' + '=' * 70)
 print('COMPLETADO')
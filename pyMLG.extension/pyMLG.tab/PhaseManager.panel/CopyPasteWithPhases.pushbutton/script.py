@@ -1,105 +1,101 @@
 # -*- coding: utf-8 -*-
 """Paste Aligned to Current View With Phases
 Fügt Elemente ausgerichtet zur aktuellen Ansicht ein mit Phase-Beibehaltung
+Shift-Klick: Auf mehrere Level gleichzeitig einfügen
 """
 
 __title__ = "Paste Aligned\nView"
 __author__ = "Manuel"
 
+import time
+
 from Autodesk.Revit.DB import *
-from pyrevit import revit
+from pyrevit import revit, forms, EXEC_PARAMS
 from System.Collections.Generic import List
 
+from pymlg import phase_copy
+
 doc = revit.doc
 uidoc = revit.uidoc
 
+
+def pick_target_levels():
+    """Shift-Klick: Level-Auswahl, sonst das Level der aktiven Ansicht"""
+    if EXEC_PARAMS.config_mode:
+        levels = sorted(FilteredElementCollector(doc).OfClass(Level), key=lambda l: l.Elevation)
+        level_dict = dict((l.Name, l) for l in levels)
+        selected_names = forms.SelectFromList.show(
+            [l.Name for l in levels],
+            title="Ziel-Level wählen",
+            multiselect=True,
+        )
+        return [level_dict[name] for name in selected_names or []]
+
+    active_view = doc.ActiveView
+    if not hasattr(active_view, 'GenLevel') or not active_view.GenLevel:
+        print("Aktive Ansicht hat kein zugeordnetes Level!")
+        return []
+    return [active_view.GenLevel]
+
+
 selected_ids = uidoc.Selection.GetElementIds()
 
 if not selected_ids or selected_ids.Count == 0:
     print("Keine Elemente ausgewählt!")
 else:
-    active_view = doc.ActiveView
+    target_levels = pick_target_levels()
+
+    if target_levels:
+        # Phasen, Level und Base Offsets einmal lesen (für alle Ziel-Level)
+        original_params = phase_copy.snapshot(doc, selected_ids)
+
+        # Auswahl nach Quell-Level gruppieren (gemischte Auswahl in einem Lauf),
+        # Türen/Fenster/verschachtelte Familien in der Gruppe ihres Hosts
+        hosts = phase_copy.host_map(doc, selected_ids)
+        level_groups = []
+        for level_id, group_ids in phase_copy.group_by_level(original_params, selected_ids, hosts):
+            level_groups.append((doc.GetElement(level_id) if level_id else None, group_ids))
+
+        # Elemente ohne Level: Verschiebung wie das erste Element mit Level
+        fallback_level = next((level for level, _ in level_groups if level), None)
 
-    if not hasattr(active_view, 'GenLevel') or not active_view.GenLevel:
-        print("Aktive Ansicht hat kein zugeordnetes Level!")
-    else:
-        target_level = active_view.GenLevel
-
-        # Speichere Original-Phasen und ermittle Basis-Level
-        original_phases = {}
-        base_level = None
-
-        for elem_id in selected_ids:
-            elem = doc.GetElement(elem_id)
-            if elem:
-                phase_created = elem.get_Parameter(BuiltInParameter.PHASE_CREATED)
-                phase_demolished = elem.get_Parameter(BuiltInParameter.PHASE_DEMOLISHED)
-                original_phases[elem_id.IntegerValue] = {
-                    'created': phase_created.AsElementId() if phase_created else None,
-                    'demolished': phase_demolished.AsElementId() if phase_demolished else None
-                }
-
-                if not base_level:
-                    level_param = elem.get_Parameter(BuiltInParameter.LEVEL_PARAM)
-                    if level_param:
-                        base_level = doc.GetElement(level_param.AsElementId())
-
-        # Berechne Z-Offset
-        if base_level:
-            z_offset = target_level.Elevation - base_level.Elevation
-        else:
-            z_offset = 0
-
-        translation = XYZ(0, 0, z_offset)
-
-        t = None
         try:
-            t = Transaction(doc, "Paste Aligned to View")
-            t.Start()
-
-            element_ids_list = List[ElementId](selected_ids)
-            copied_ids = ElementTransformUtils.CopyElements(doc, element_ids_list, translation)
-
-            # WICHTIG: Erst Level setzen, dann Phasen
-            for i, copied_id in enumerate(copied_ids):
-                original_id = list(selected_ids)[i]
-                copied_elem = doc.GetElement(copied_id)
-
-                # 1. LEVEL SETZEN (wichtigster Schritt!)
-                level_param = copied_elem.get_Parameter(BuiltInParameter.LEVEL_PARAM)
-                if level_param and not level_param.IsReadOnly:
-                    level_param.Set(target_level.Id)
-
-                # Für Wände: Base Constraint und Top Constraint
-                base_constraint = copied_elem.get_Parameter(BuiltInParameter.WALL_BASE_CONSTRAINT)
-                if base_constraint and not base_constraint.IsReadOnly:
-                    base_constraint.Set(target_level.Id)
-
-                # Base Offset auf 0 setzen damit es wirklich auf dem Level sitzt
-                base_offset = copied_elem.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET)
-                if base_offset and not base_offset.IsReadOnly:
-                    original_elem = doc.GetElement(original_id)
-                    original_offset = original_elem.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET)
-                    if original_offset:
-                        base_offset.Set(original_offset.AsDouble())
-
-                # 2. PHASEN SETZEN
-                if original_id.IntegerValue in original_phases:
-                    phase_info = original_phases[original_id.IntegerValue]
-                    if phase_info['created']:
-                        param = copied_elem.get_Parameter(BuiltInParameter.PHASE_CREATED)
-                        if param and not param.IsReadOnly:
-                            param.Set(phase_info['created'])
-                    if phase_info['demolished']:
-                        param = copied_elem.get_Parameter(BuiltInParameter.PHASE_DEMOLISHED)
-                        if param and not param.IsReadOnly:
-                            param.Set(phase_info['demolished'])
-
-            uidoc.Selection.SetElementIds(copied_ids)
-            t.Commit()
-            print("{} Element(e) auf Level '{}' eingefuegt".format(copied_ids.Count, target_level.Name))
+            # Transaction des Schnappschusses: Cache wird danach verworfen
+            with original_params.transaction("Paste Aligned to View"):
+                all_copied = List[ElementId]()
+                timings = []
+                for target_level in target_levels:
+                    start = time.time()
+
+                    # Berechne Z-Offset pro Quell-Level
+                    z_offsets = []
+                    for base_level, _ in level_groups:
+                        base_level = base_level or fallback_level
+                        z_offsets.append(target_level.Elevation - base_level.Elevation if base_level else 0)
+
+                    # Ein CopyElements für die ganze Auswahl (Hosting bleibt erhalten),
+                    # Zuordnung Original -> Kopie einmalig bilden
+                    pairs = phase_copy.copy_level_groups(doc, level_groups, z_offsets)
+
+                    # WICHTIG: Erst Level setzen, dann Phasen
+                    phase_copy.assign_level(doc, pairs, target_level.Id, original_params)
+                    phase_copy.apply_phases(doc, pairs, original_params)
+
+                    for _, copy_id in pairs:
+                        all_copied.Add(copy_id)
+                    level_count = len(pairs)
+
+                    timings.append((target_level.Name, level_count, time.time() - start))
+
+                uidoc.Selection.SetElementIds(all_copied)
+
+            if len(level_groups) > 1:
+                print("{} Quell-Level in der Auswahl".format(len(level_groups)))
+            for level_name, count, elapsed in timings:
+                print("{} Element(e) auf Level '{}' eingefuegt ({:.2f} s)".format(count, level_name, elapsed))
+            if len(timings) > 1:
+                print("Gesamt: {} Element(e) auf {} Level ({:.2f} s)".format(
+                    all_copied.Count, len(timings), sum(e for _, _, e in timings)))
 
         except Exception as e:
-            if t and t.HasStarted():
-                t.RollBack()
-            print("Fehler: {}".format(str(e)))
\ No newline at end of file
+            print("Fehler: {}".format(str(e)))
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""Tests für pymlg.schedule_rows gegen einen Stub-Schedule (ohne Revit)
+
+Aufruf aus dem Repository-Ordner:  python -m pytest tests
+"""
+
+import os
+import sys
+import types
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "pyMLG.extension", "lib"))
+
+from pymlg import schedule_rows  # noqa: E402
+from pymlg.benchmarks import FakeDocument, FakeElement, FakeElementId  # noqa: E402
+
+
+class FakeTextParameter(object):
+    """Kommentar-Parameter; gesperrte Elemente werfen bei Set (wie in Gruppen)"""
+
+    StorageType = "String"
+
+    def __init__(self, value=u"", locked=False):
+        self.value = value
+        self.locked = locked
+        self.IsReadOnly = False
+
+    def AsString(self):
+        return self.value
+
+    def Set(self, value):
+        if self.locked:
+            raise Exception("Element ist gesperrt")
+        self.value = value
+
+
+class FakeField(object):
+    def __init__(self, field_id, parameter_id, hidden=False):
+        self.FieldId = field_id
+        self.ParameterId = parameter_id
+        self.IsHidden = hidden
+
+
+class FakeSortGroup(object):
+    def __init__(self, field_id):
+        self.FieldId = field_id
+
+
+class FakeScheduleDefinition(object):
+    """Name-Feld sichtbar und gruppiert, Kommentar nur als verfügbares Feld"""
+
+    def __init__(self, comment_param_id):
+        self.IsItemized = True
+        self.fields = [FakeField(1, FakeElementId("NAME"))]
+        self.schedulable = FakeField(None, comment_param_id, hidden=True)
+
+    def GetFieldCount(self):
+        return len(self.fields)
+
+    def GetField(self, index):
+        return self.fields[index]
+
+    def GetSchedulableFields(self):
+        return [self.schedulable]
+
+    def GetFilters(self):
+        return []
+
+    def GetSortGroupFields(self):
+        return [FakeSortGroup(1)]
+
+    def AddField(self, schedulable):
+        field = FakeField(len(self.fields) + 1, schedulable.ParameterId, hidden=True)
+        self.fields.append(field)
+        return field
+
+
+class FakeScheduleBody(object):
+    """Body-Zeilen: ("text", erste Spalte) oder ("element", element)"""
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.NumberOfRows = len(schedule.rows)
+
+    def GetCellText(self, row, column):
+        kind, value = self.schedule.rows[row]
+        if kind == "text":
+            return value if column == 0 else u""
+        if column == 0:
+            return u"Element {}".format(value.Id.IntegerValue)
+        # Kommentar-Spalte erst nach AddField sichtbar
+        if len(self.schedule.Definition.fields) < 2:
+            return u""
+        return value.get_Parameter(FakeRevitDB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS).value
+
+
+class FakeSchedule(object):
+    def __init__(self, rows):
+        self.Id = FakeElementId(-100)
+        self.rows = rows
+        self.Definition = FakeScheduleDefinition(FakeElementId(FakeRevitDB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS))
+
+    def GetTableData(self):
+        return self
+
+    def GetSectionData(self, section):
+        return FakeScheduleBody(self)
+
+
+class FakeScheduleDocument(FakeDocument):
+    """Dokument mit Schedule-Elementen; Transaction-Rollback stellt Kommentare wieder her"""
+
+    def __init__(self, read_only=False, workshared=False):
+        FakeDocument.__init__(self)
+        self.read_only = read_only
+        self.IsWorkshared = workshared
+        self.owned = set()
+        self.schedule_ids = []
+
+    def add_commented(self, comment=u"", locked=False):
+        elem_id = FakeElementId(len(self.elements) + 1)
+        self.elements[elem_id.IntegerValue] = FakeElement(elem_id, {
+            FakeRevitDB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS: FakeTextParameter(comment, locked),
+        })
+        self.schedule_ids.append(elem_id)
+        return self.elements[elem_id.IntegerValue]
+
+    def comments(self):
+        bip = FakeRevitDB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS
+        return dict((key, elem.get_Parameter(bip).value) for key, elem in self.elements.items())
+
+    def Regenerate(self):
+        pass
+
+
+class FakeTransaction(object):
+    def __init__(self, doc, name):
+        self.doc = doc
+        self._state = None
+        self._saved = None
+
+    def Start(self):
+        if self.doc.read_only:
+            raise Exception("Dokument ist schreibgeschützt")
+        self._saved = self.doc.comments()
+        self._state = "started"
+        return FakeRevitDB.TransactionStatus.Started
+
+    def HasStarted(self):
+        return self._state is not None
+
+    def HasEnded(self):
+        return self._state == "ended"
+
+    def RollBack(self):
+        bip = FakeRevitDB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS
+        for key, value in self._saved.items():
+            self.doc.elements[key].get_Parameter(bip).value = value
+        self._state = "ended"
+
+
+class _FakeCollector(object):
+    def __init__(self, doc, view_id=None):
+        self.doc = doc
+
+    def ToElementIds(self):
+        return list(self.doc.schedule_ids)
+
+
+class FakeRevitDB(object):
+    """Ersatz für die in schedule_rows benutzten Namen aus Autodesk.Revit.DB"""
+
+    class BuiltInParameter(object):
+        ALL_MODEL_INSTANCE_COMMENTS = "ALL_MODEL_INSTANCE_COMMENTS"
+
+    class SectionType(object):
+        Body = "Body"
+
+    class TransactionStatus(object):
+        Started = "Started"
+
+    class CheckoutStatus(object):
+        OwnedByCurrentUser = "OwnedByCurrentUser"
+        NotOwned = "NotOwned"
+
+    class WorksharingUtils(object):
+        @staticmethod
+        def GetCheckoutStatus(doc, elem_id):
+            if elem_id.IntegerValue in doc.owned:
+                return FakeRevitDB.CheckoutStatus.OwnedByCurrentUser
+            return FakeRevitDB.CheckoutStatus.NotOwned
+
+    ElementId = FakeElementId
+    FilteredElementCollector = _FakeCollector
+    Transaction = FakeTransaction
+
+
+@contextmanager
+def _fake_revit_db(namespace):
+    """Stellt `namespace` vorübergehend als Autodesk.Revit.DB bereit"""
+    names = ("Autodesk", "Autodesk.Revit", "Autodesk.Revit.DB")
+    saved = dict((name, sys.modules.get(name)) for name in names)
+    modules = [types.ModuleType(name) for name in names]
+    for name in dir(namespace):
+        if not name.startswith("_"):
+            setattr(modules[2], name, getattr(namespace, name))
+    modules[0].Revit, modules[1].DB = modules[1], modules[2]
+    sys.modules.update(zip(names, modules))
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def _fake_grouped_schedule(doc, groups, locked=()):
+    """
+    Schedule mit Gruppenkopf, Element-Zeilen, Summenzeile und Leerzeile pro Gruppe
+    Returns: (schedule, dict {body_zeile: element_id (int)} der erwarteten Element-Zeilen)
+    """
+    rows = []
+    expected = {}
+    index = 0
+    for group, count in enumerate(groups):
+        rows.append(("text", u"Typ {}".format(group)))
+        for _ in range(count):
+            elem = doc.add_commented(u"Kommentar {}".format(index), locked=index in locked)
+            if index not in locked:
+                expected[len(rows)] = elem.Id.IntegerValue
+            rows.append(("element", elem))
+            index += 1
+        rows.append(("text", u"Summe: {}".format(count)))
+        rows.append(("text", u""))
+    return FakeSchedule(rows), expected
+
+
+
+@pytest.fixture
+def revit_db():
+    with _fake_revit_db(FakeRevitDB):
+        yield
+
+
+def test_parse_row_keys_skips_group_total_and_blank_rows():
+    prefix = schedule_rows.KEY_PREFIX
+    texts = [u"", u"Typ A", prefix + u"12", prefix + u"x", None, u"Summe: 3", prefix + u"13", u"12"]
+    assert schedule_rows.parse_row_keys(texts) == {2: 12, 6: 13}
+
+
+def test_grouped_schedule_maps_element_rows_only(revit_db):
+    doc = FakeScheduleDocument()
+    schedule, expected = _fake_grouped_schedule(doc, (3, 2, 4))
+    index = schedule_rows.build_row_index(doc, schedule)
+    assert index.row_to_id == expected
+    # Gruppenkopf, Summen- und Leerzeile der ersten Gruppe
+    assert index.element_id(0) is None
+    assert index.element_id(4) is None
+    assert index.element_id(5) is None
+
+
+def test_locked_element_stays_unmapped_and_comments_are_rolled_back(revit_db):
+    doc = FakeScheduleDocument()
+    schedule, expected = _fake_grouped_schedule(doc, (3, 2, 4), locked=(4,))
+    before = doc.comments()
+    index = schedule_rows.build_row_index(doc, schedule)
+    assert index.row_to_id == expected
+    assert doc.comments() == before
+
+
+def test_no_index_without_writable_elements(revit_db):
+    doc = FakeScheduleDocument()
+    schedule, _ = _fake_grouped_schedule(doc, (2, 2), locked=(0, 1, 2, 3))
+    assert schedule_rows.build_row_index(doc, schedule) is None
+
+
+def test_no_index_in_read_only_document(revit_db):
+    doc = FakeScheduleDocument(read_only=True)
+    schedule, _ = _fake_grouped_schedule(doc, (2, 2))
+    assert schedule_rows.build_row_index(doc, schedule) is None
+
+
+def test_workshared_index_only_for_owned_elements(revit_db):
+    doc = FakeScheduleDocument(workshared=True)
+    schedule, expected = _fake_grouped_schedule(doc, (2, 2))
+    before = doc.comments()
+    assert schedule_rows.build_row_index(doc, schedule) is None
+    assert doc.comments() == before
+
+    doc.owned.update(elem_id.IntegerValue for elem_id in doc.schedule_ids)
+    assert schedule_rows.build_row_index(doc, schedule).row_to_id == expected